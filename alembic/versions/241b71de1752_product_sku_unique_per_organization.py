@@ -0,0 +1,60 @@
+"""product sku unique per organization
+
+Revision ID: 241b71de1752
+Revises: 5bfc1ad7a68d
+Create Date: 2026-10-17 19:16:34.239340
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "241b71de1752"
+down_revision: Union[str, None] = "5bfc1ad7a68d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The per-organization index is built before the global one is dropped,
+    # so SKUs stay unique throughout
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_organization_id_sku",
+            "products",
+            ["organization_id", "sku"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_products_sku",
+            table_name="products",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if two organizations have since been given the same SKU
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_sku",
+            "products",
+            ["sku"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_products_organization_id_sku",
+            table_name="products",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
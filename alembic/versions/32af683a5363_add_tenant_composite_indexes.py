@@ -0,0 +1,60 @@
+"""add tenant composite indexes
+
+Revision ID: 32af683a5363
+Revises: 91c954289b4c
+Create Date: 2026-10-17 18:45:15.233275
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "32af683a5363"
+down_revision: Union[str, None] = "91c954289b4c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_clients_organization_id_id", "clients", ["organization_id", "id"]),
+    ("ix_clients_organization_id_email", "clients", ["organization_id", "email"]),
+    ("ix_products_organization_id_id", "products", ["organization_id", "id"]),
+    ("ix_invoices_organization_id_id", "invoices", ["organization_id", "id"]),
+    (
+        "ix_invoices_organization_id_status_due_date",
+        "invoices",
+        ["organization_id", "status", "due_date"],
+    ),
+    ("ix_invoice_items_invoice_id", "invoice_items", ["invoice_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, but it does
+    # not block writes, so this can run against a live database
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,59 @@
+"""product low stock tracking
+
+Revision ID: 5bfc1ad7a68d
+Revises: c08990ebc638
+Create Date: 2026-10-17 19:14:57.616312
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5bfc1ad7a68d"
+down_revision: Union[str, None] = "c08990ebc638"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+LOW_STOCK = "quantity_in_stock <= reorder_level"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "products",
+        sa.Column(
+            "low_stock_notified",
+            sa.Boolean(),
+            server_default=sa.text("false"),
+            nullable=False,
+        ),
+    )
+    # Products already low on stock when this runs are not reported
+    op.execute(f"UPDATE products SET low_stock_notified = true WHERE {LOW_STOCK}")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_low_stock",
+            "products",
+            ["organization_id", "id"],
+            postgresql_where=sa.text(LOW_STOCK),
+            sqlite_where=sa.text(LOW_STOCK),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_products_low_stock",
+            table_name="products",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("products", "low_stock_notified")
@@ -0,0 +1,32 @@
+"""add user token epoch
+
+Revision ID: 5c373dcae0dc
+Revises: 5180199d48c2
+Create Date: 2026-10-17 18:36:33.549414
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c373dcae0dc"
+down_revision: Union[str, None] = "5180199d48c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("token_epoch", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "token_epoch")
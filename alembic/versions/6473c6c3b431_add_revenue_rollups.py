@@ -0,0 +1,72 @@
+"""add revenue rollups
+
+Revision ID: 6473c6c3b431
+Revises: 32af683a5363
+Create Date: 2026-10-17 18:58:14.540156
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6473c6c3b431"
+down_revision: Union[str, None] = "32af683a5363"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+STATUSES = ("DRAFT", "PENDING", "PAID", "CANCELLED")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # Reuse the type created with the invoices table
+        status_type = postgresql.ENUM(
+            *STATUSES, name="invoicestatus", create_type=False
+        )
+        month = "date_trunc('month', issue_date)::date"
+    else:
+        status_type = sa.Enum(*STATUSES, name="invoicestatus")
+        month = "date(issue_date, 'start of month')"
+
+    op.create_table(
+        "revenue_rollups",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("client_id", sa.Integer(), nullable=False),
+        sa.Column("status", status_type, nullable=False),
+        sa.Column("invoice_count", sa.Integer(), nullable=False),
+        sa.Column("subtotal", sa.Float(), nullable=False),
+        sa.Column("tax_amount", sa.Float(), nullable=False),
+        sa.Column("total", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["client_id"], ["clients.id"]),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("organization_id", "month", "client_id", "status"),
+    )
+
+    # Backfill from the existing invoices
+    op.execute(
+        f"""
+        INSERT INTO revenue_rollups (
+            organization_id, month, client_id, status,
+            invoice_count, subtotal, tax_amount, total
+        )
+        SELECT organization_id, {month}, client_id, status,
+               count(*), sum(subtotal), sum(coalesce(tax_amount, 0)), sum(total)
+        FROM invoices
+        WHERE status IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("revenue_rollups")
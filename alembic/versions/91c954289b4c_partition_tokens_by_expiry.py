@@ -0,0 +1,137 @@
+"""partition tokens by expiry
+
+Revision ID: 91c954289b4c
+Revises: 5c373dcae0dc
+Create Date: 2026-10-17 18:39:32.024683
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "91c954289b4c"
+down_revision: Union[str, None] = "5c373dcae0dc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Monthly partitions created up front; the purge job keeps creating new ones
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # Keep the old table (and its id sequence) around until the data is copied
+    op.execute("ALTER TABLE tokens RENAME TO tokens_unpartitioned")
+    op.execute(
+        "ALTER TABLE tokens_unpartitioned "
+        "RENAME CONSTRAINT tokens_pkey TO tokens_unpartitioned_pkey"
+    )
+    op.execute("ALTER SEQUENCE tokens_id_seq OWNED BY NONE")
+    op.drop_index("ix_tokens_id", table_name="tokens_unpartitioned")
+    op.drop_index("ix_tokens_jti", table_name="tokens_unpartitioned")
+
+    # Partitioned tables need the partition key in every unique constraint,
+    # so the primary key becomes (id, expires_at) and jti loses its unique
+    # constraint; jtis are random UUIDs.
+    op.execute(
+        """
+        CREATE TABLE tokens (
+            id INTEGER NOT NULL DEFAULT nextval('tokens_id_seq'),
+            jti VARCHAR(36),
+            token_type VARCHAR(10),
+            user_id INTEGER,
+            revoked BOOLEAN,
+            expires_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT tokens_pkey PRIMARY KEY (id, expires_at),
+            CONSTRAINT tokens_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)
+        ) PARTITION BY RANGE (expires_at)
+        """
+    )
+    op.execute("CREATE TABLE tokens_default PARTITION OF tokens DEFAULT")
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month DATE := date_trunc('month', now() AT TIME ZONE 'utc');
+        BEGIN
+            FOR i IN 0..{MONTHS_AHEAD} LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF tokens FOR VALUES FROM (%L) TO (%L)',
+                    'tokens_p' || to_char(month, 'YYYY_MM'),
+                    month,
+                    month + interval '1 month'
+                );
+                month := month + interval '1 month';
+            END LOOP;
+        END $$
+        """
+    )
+    op.create_index("ix_tokens_id", "tokens", ["id"])
+    op.create_index("ix_tokens_jti", "tokens", ["jti"])
+
+    # Expired tokens are useless, so only live ones are carried over
+    op.execute(
+        """
+        INSERT INTO tokens
+            (id, jti, token_type, user_id, revoked, expires_at, created_at)
+        SELECT id, jti, token_type, user_id, revoked, expires_at, created_at
+        FROM tokens_unpartitioned
+        WHERE expires_at > now() AT TIME ZONE 'utc'
+        """
+    )
+    op.drop_table("tokens_unpartitioned")
+    op.execute("ALTER SEQUENCE tokens_id_seq OWNED BY tokens.id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE tokens RENAME TO tokens_partitioned")
+    op.execute(
+        "ALTER TABLE tokens_partitioned "
+        "RENAME CONSTRAINT tokens_pkey TO tokens_partitioned_pkey"
+    )
+    op.execute("ALTER SEQUENCE tokens_id_seq OWNED BY NONE")
+    op.drop_index("ix_tokens_id", table_name="tokens_partitioned")
+    op.drop_index("ix_tokens_jti", table_name="tokens_partitioned")
+
+    op.execute(
+        """
+        CREATE TABLE tokens (
+            id INTEGER NOT NULL DEFAULT nextval('tokens_id_seq'),
+            jti VARCHAR(36),
+            token_type VARCHAR(10),
+            user_id INTEGER,
+            revoked BOOLEAN,
+            expires_at TIMESTAMP WITHOUT TIME ZONE,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            CONSTRAINT tokens_pkey PRIMARY KEY (id),
+            CONSTRAINT tokens_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO tokens
+            (id, jti, token_type, user_id, revoked, expires_at, created_at)
+        SELECT id, jti, token_type, user_id, revoked, expires_at, created_at
+        FROM tokens_partitioned
+        """
+    )
+    op.create_index("ix_tokens_id", "tokens", ["id"])
+    op.create_index("ix_tokens_jti", "tokens", ["jti"], unique=True)
+
+    # Dropping the parent drops every partition with it
+    op.drop_table("tokens_partitioned")
+    op.execute("ALTER SEQUENCE tokens_id_seq OWNED BY tokens.id")
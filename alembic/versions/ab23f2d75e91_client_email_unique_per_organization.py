@@ -0,0 +1,65 @@
+"""client email unique per organization
+
+Revision ID: ab23f2d75e91
+Revises: 241b71de1752
+Create Date: 2026-10-17 19:20:33.749555
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ab23f2d75e91"
+down_revision: Union[str, None] = "241b71de1752"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _replace_organization_email_index(unique: bool) -> None:
+    op.drop_index(
+        "ix_clients_organization_id_email",
+        table_name="clients",
+        postgresql_concurrently=True,
+        if_exists=True,
+    )
+    op.create_index(
+        "ix_clients_organization_id_email",
+        "clients",
+        ["organization_id", "email"],
+        unique=unique,
+        postgresql_concurrently=True,
+        if_not_exists=True,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The global index keeps emails unique until the per-organization one
+    # is in place
+    with op.get_context().autocommit_block():
+        _replace_organization_email_index(unique=True)
+        op.drop_index(
+            "ix_clients_email",
+            table_name="clients",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Fails if two organizations have since been given the same email
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_clients_email",
+            "clients",
+            ["email"],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        _replace_organization_email_index(unique=False)
@@ -0,0 +1,48 @@
+"""per organization invoice numbers
+
+Revision ID: be6562b5284f
+Revises: 6473c6c3b431
+Create Date: 2026-10-17 19:01:54.817452
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "be6562b5284f"
+down_revision: Union[str, None] = "6473c6c3b431"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "invoice_number_counters",
+        sa.Column("organization_id", sa.Integer(), nullable=False),
+        sa.Column("next_value", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["organization_id"], ["organizations.id"]),
+        sa.PrimaryKeyConstraint("organization_id"),
+    )
+    # Numbers are allocated per organization, so they only need to be unique
+    # within one
+    op.drop_index("ix_invoices_invoice_number", table_name="invoices")
+    op.create_index(
+        "ix_invoices_organization_id_invoice_number",
+        "invoices",
+        ["organization_id", "invoice_number"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_invoices_organization_id_invoice_number", table_name="invoices")
+    op.create_index(
+        "ix_invoices_invoice_number", "invoices", ["invoice_number"], unique=True
+    )
+    op.drop_table("invoice_number_counters")
@@ -0,0 +1,46 @@
+"""product search index
+
+Revision ID: c08990ebc638
+Revises: 1504a13c35da
+Create Date: 2026-10-17 19:09:27.670040
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c08990ebc638"
+down_revision: Union[str, None] = "1504a13c35da"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match models.product.PRODUCT_SEARCH_TEXT
+SEARCH_TEXT = "(name || ' ' || coalesce(sku, '') || ' ' || coalesce(description, ''))"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so the catalog stays writable while it is indexed
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_search_text "
+            f"ON products USING gin ({SEARCH_TEXT} gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_search_text")
@@ -0,0 +1,45 @@
+"""tokens jti index not unique
+
+Revision ID: c54328ebc4b3
+Revises: ab23f2d75e91
+Create Date: 2026-10-17 19:29:55.611803
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c54328ebc4b3"
+down_revision: Union[str, None] = "ab23f2d75e91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Postgres got this shape with the partitioning in 91c954289b4c; bring
+    # the other databases in line with it and the model
+    if op.get_bind().dialect.name == "postgresql":
+        return
+
+    op.drop_index("ix_tokens_jti", table_name="tokens")
+    op.create_index("ix_tokens_jti", "tokens", ["jti"])
+    # Tokens without an expiry cannot be validated and are never issued
+    op.execute("DELETE FROM tokens WHERE expires_at IS NULL")
+    with op.batch_alter_table("tokens") as batch_op:
+        batch_op.alter_column("expires_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        return
+
+    with op.batch_alter_table("tokens") as batch_op:
+        batch_op.alter_column("expires_at", existing_type=sa.DateTime(), nullable=True)
+    op.drop_index("ix_tokens_jti", table_name="tokens")
+    op.create_index("ix_tokens_jti", "tokens", ["jti"], unique=True)
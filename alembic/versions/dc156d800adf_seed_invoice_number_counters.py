@@ -0,0 +1,96 @@
+"""seed invoice number counters
+
+Revision ID: dc156d800adf
+Revises: c54328ebc4b3
+Create Date: 2026-10-17 19:33:48.173059
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "dc156d800adf"
+down_revision: Union[str, None] = "c54328ebc4b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The default INVOICE_NUMBER_FORMAT when this revision was written, pinned so
+# the migration does not change with the app's code or configuration
+NUMBER_FORMAT = "INV-{number:06d}"
+NUMBER_PREFIX = "INV-"
+
+invoices = sa.table(
+    "invoices",
+    sa.column("organization_id", sa.Integer),
+    sa.column("invoice_number", sa.String),
+)
+counters = sa.table(
+    "invoice_number_counters",
+    sa.column("organization_id", sa.Integer),
+    sa.column("next_value", sa.BigInteger),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Counters created since be6562b5284f started at 1, below the numbers
+    # organizations already had; move them past those numbers. Only numbers
+    # in NUMBER_FORMAT are considered. Run it with no workers holding blocks.
+    bind = op.get_bind()
+    organization_ids = bind.execute(
+        sa.select(invoices.c.organization_id).distinct()
+    ).scalars()
+    for organization_id in list(organization_ids):
+        start = _highest_number(bind, organization_id) + 1
+        if start == 1:
+            continue
+        next_value = bind.execute(
+            sa.select(counters.c.next_value).where(
+                counters.c.organization_id == organization_id
+            )
+        ).scalar()
+        if next_value is None:
+            op.bulk_insert(
+                counters, [{"organization_id": organization_id, "next_value": start}]
+            )
+        elif next_value < start:
+            bind.execute(
+                counters.update()
+                .where(counters.c.organization_id == organization_id)
+                .values(next_value=start)
+            )
+
+
+def _highest_number(bind, organization_id: int) -> int:
+    # Numbers of more digits are higher, and among numbers of one length the
+    # order is lexicographic, so the first candidate that parses is the highest
+    candidates = bind.execute(
+        sa.select(invoices.c.invoice_number)
+        .where(
+            invoices.c.organization_id == organization_id,
+            invoices.c.invoice_number.startswith(NUMBER_PREFIX),
+        )
+        .order_by(
+            sa.func.length(invoices.c.invoice_number).desc(),
+            invoices.c.invoice_number.desc(),
+        )
+        .execution_options(yield_per=1000)
+    ).scalars()
+    for invoice_number in candidates:
+        digits = invoice_number[len(NUMBER_PREFIX) :]
+        if not (digits.isascii() and digits.isdigit()):
+            continue
+        # Only numbers the format renders back exactly, so no "INV-01"
+        if NUMBER_FORMAT.format(number=int(digits)) == invoice_number:
+            return int(digits)
+    return 0
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # The seeded counters are still valid under the previous revision
+    pass
@@ -0,0 +1,125 @@
+"""Shared setup for the API benchmarks."""
+
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from config import SessionLocal
+from models.client import Client
+from models.invoice import Invoice, InvoiceItem, InvoiceNumberCounter
+from models.product import Product
+from models.report import RevenueRollup
+from models.user import Organization, Token, User
+from utils import UserContext
+from utils.auth import create_tokens
+
+
+@dataclass
+class BenchmarkTenant:
+    headers: dict
+    user: UserContext
+    client_id: int
+    product_ids: list
+
+
+@contextmanager
+def benchmark_tenant(products: int = 10):
+    """
+    Create a throwaway organization with a user, a client and some products.
+
+    Yields a ``BenchmarkTenant`` and deletes everything the organization owns
+    on exit.
+    """
+    suffix = uuid.uuid4().hex[:8]
+    db = SessionLocal()
+    try:
+        organization = Organization(name=f"bench-{suffix}")
+        db.add(organization)
+        db.flush()
+        user = User(
+            email=f"bench-{suffix}@example.com",
+            first_name="Bench",
+            is_email_verified=True,
+            organization_id=organization.id,
+        )
+        client = Client(
+            name="Bench client",
+            email=f"client-{suffix}@example.com",
+            organization_id=organization.id,
+        )
+        db_products = [
+            Product(
+                name=f"product {i}",
+                sku=f"BENCH-{suffix}-{i}",
+                unit_price=10 + i,
+                organization_id=organization.id,
+            )
+            for i in range(products)
+        ]
+        db.add_all([user, client, *db_products])
+        db.commit()
+
+        tokens = create_tokens(user.id, db)
+        yield BenchmarkTenant(
+            headers={"Authorization": f"Bearer {tokens['access']}"},
+            user=UserContext(
+                id=user.id,
+                organization_id=organization.id,
+                is_active=True,
+                is_admin=False,
+                is_email_verified=True,
+            ),
+            client_id=client.id,
+            product_ids=[product.id for product in db_products],
+        )
+    finally:
+        db.rollback()
+        invoice_ids = select(Invoice.id).where(
+            Invoice.organization_id == organization.id
+        )
+        db.execute(delete(InvoiceItem).where(InvoiceItem.invoice_id.in_(invoice_ids)))
+        db.execute(delete(Invoice).where(Invoice.organization_id == organization.id))
+        db.execute(
+            delete(RevenueRollup).where(
+                RevenueRollup.organization_id == organization.id
+            )
+        )
+        db.execute(
+            delete(InvoiceNumberCounter).where(
+                InvoiceNumberCounter.organization_id == organization.id
+            )
+        )
+        db.execute(delete(Product).where(Product.organization_id == organization.id))
+        db.execute(delete(Client).where(Client.organization_id == organization.id))
+        db.execute(delete(Token).where(Token.user_id == user.id))
+        db.execute(delete(User).where(User.id == user.id))
+        db.execute(delete(Organization).where(Organization.id == organization.id))
+        db.commit()
+        db.close()
+
+
+def invoice_payloads(tenant: BenchmarkTenant, count: int, items: int) -> list[dict]:
+    """InvoiceCreate payloads with unique invoice numbers for the tenant."""
+    prefix = uuid.uuid4().hex[:8]
+    now = datetime.utcnow()
+    return [
+        {
+            "invoice_number": f"BENCH-{prefix}-{i}",
+            "issue_date": now.isoformat(),
+            "due_date": (now + timedelta(days=30)).isoformat(),
+            "tax_rate": 0.2,
+            "customer_id": tenant.client_id,
+            "items": [
+                {
+                    "product_id": tenant.product_ids[(i + j) % len(tenant.product_ids)],
+                    "quantity": j + 1,
+                    "unit_price": 9.5,
+                }
+                for j in range(items)
+            ],
+        }
+        for i in range(count)
+    ]
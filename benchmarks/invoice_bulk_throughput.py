@@ -0,0 +1,53 @@
+"""
+Compare invoice creation throughput of POST /invoices/bulk against looping
+over POST /invoices.
+
+Usage:
+    python -m benchmarks.invoice_bulk_throughput --invoices 1000 --items 5
+
+Runs the app in-process against DATABASE_URL with a throwaway organization,
+which is deleted afterwards.
+"""
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import benchmark_tenant, invoice_payloads
+from main import app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--invoices", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with TestClient(app) as http, benchmark_tenant() as tenant:
+        payloads = invoice_payloads(tenant, args.invoices, args.items)
+        started = time.perf_counter()
+        for payload in payloads:
+            response = http.post("/invoices", json=payload, headers=tenant.headers)
+            response.raise_for_status()
+        single = time.perf_counter() - started
+
+        payloads = invoice_payloads(tenant, args.invoices, args.items)
+        started = time.perf_counter()
+        for offset in range(0, len(payloads), args.batch_size):
+            batch = payloads[offset : offset + args.batch_size]
+            response = http.post(
+                "/invoices/bulk", json={"invoices": batch}, headers=tenant.headers
+            )
+            response.raise_for_status()
+            assert response.json()["failed"] == 0, response.json()
+        bulk = time.perf_counter() - started
+
+    print(f"POST /invoices       {args.invoices / single:10.1f} invoices/s")
+    print(f"POST /invoices/bulk  {args.invoices / bulk:10.1f} invoices/s")
+    print(f"speedup              {single / bulk:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Compare database round-trips and latency of the create_invoice handler
+against its previous two-commit implementation.
+
+Usage:
+    python -m benchmarks.invoice_create_roundtrips --invoices 200 --items 5
+
+Calls the handlers directly against DATABASE_URL with a throwaway
+organization, which is deleted afterwards. Both paths serialize the response,
+since that is where the previous implementation lazy-loaded the items.
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import event
+
+from benchmarks.common import benchmark_tenant, invoice_payloads
+from config import SessionLocal, engine
+from models.invoice import Invoice, InvoiceItem
+from routes.invoice import create_invoice
+from schemas.request import InvoiceCreate
+from schemas.response import InvoiceResponse
+
+
+def legacy_create_invoice(invoice, db, current_user):
+    """create_invoice as it was before the single-transaction rework."""
+    subtotal = sum(item.quantity * item.unit_price for item in invoice.items)
+    tax_amount = subtotal * invoice.tax_rate if invoice.tax_rate else 0
+    total = subtotal + tax_amount
+
+    db_invoice = Invoice(
+        invoice_number=invoice.invoice_number,
+        status=invoice.status,
+        issue_date=invoice.issue_date,
+        due_date=invoice.due_date,
+        subtotal=subtotal,
+        tax_rate=invoice.tax_rate,
+        tax_amount=tax_amount,
+        total=total,
+        notes=invoice.notes,
+        customer_id=invoice.customer_id,
+        organization_id=current_user.organization_id,
+    )
+    db.add(db_invoice)
+    db.commit()
+    db.refresh(db_invoice)
+
+    for item in invoice.items:
+        db_item = InvoiceItem(
+            invoice_id=db_invoice.id,
+            product_id=item.product_id,
+            quantity=item.quantity,
+            unit_price=item.unit_price,
+            subtotal=item.quantity * item.unit_price,
+        )
+        db.add(db_item)
+
+    db.commit()
+    db.refresh(db_invoice)
+    return db_invoice
+
+
+class RoundTrips:
+    """Counts statements and commits sent to the database."""
+
+    def __init__(self):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._increment)
+        event.listen(engine, "commit", self._increment)
+
+    def _increment(self, *args, **kwargs):
+        self.count += 1
+
+    def close(self):
+        event.remove(engine, "before_cursor_execute", self._increment)
+        event.remove(engine, "commit", self._increment)
+
+
+def measure(handler, payloads, user) -> tuple[float, list]:
+    round_trips = RoundTrips()
+    latencies = []
+    try:
+        for payload in payloads:
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                InvoiceResponse.model_validate(
+                    handler(InvoiceCreate(**payload), db=db, current_user=user)
+                )
+                latencies.append(time.perf_counter() - started)
+            finally:
+                db.close()
+    finally:
+        round_trips.close()
+    return round_trips.count / len(payloads), latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--invoices", type=int, default=200)
+    parser.add_argument("--items", type=int, default=5)
+    args = parser.parse_args()
+
+    with benchmark_tenant() as tenant:
+        for name, handler in [
+            ("previous", legacy_create_invoice),
+            ("current", create_invoice),
+        ]:
+            payloads = invoice_payloads(tenant, args.invoices, args.items)
+            round_trips, latencies = measure(handler, payloads, tenant.user)
+            latencies.sort()
+            print(
+                f"{name:<10} round-trips {round_trips:5.1f}"
+                f"  p50 {statistics.median(latencies) * 1000:6.2f} ms"
+                f"  p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Compare query plans of the organization-scoped queries with and without the
+composite tenant indexes (migration 32af683a5363).
+
+Usage:
+    python -m benchmarks.tenant_index_plans --organizations 20 --rows 2000
+
+Seeds synthetic organizations, prints EXPLAIN ANALYZE output with the indexes
+in place, drops them and prints the plans again. Everything happens in one
+transaction that is rolled back, but the tables stay locked until it ends:
+run this against a development database only.
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, text
+
+from config import engine
+from models.client import Client
+from models.enums import InvoiceStatus
+from models.invoice import Invoice, InvoiceItem
+from models.product import Product
+from models.user import Organization
+
+COMPOSITE_INDEXES = [
+    "ix_clients_organization_id_id",
+    "ix_clients_organization_id_email",
+    "ix_products_organization_id_id",
+    "ix_invoices_organization_id_id",
+    "ix_invoices_organization_id_status_due_date",
+    "ix_invoice_items_invoice_id",
+]
+
+
+def seed(connection, organizations: int, rows: int) -> int:
+    """Insert synthetic data and return the id of the organization to query."""
+    now = datetime.utcnow()
+    org_ids = (
+        connection.execute(
+            insert(Organization).returning(Organization.id),
+            [{"name": f"bench-{i}"} for i in range(organizations)],
+        )
+        .scalars()
+        .all()
+    )
+
+    for org_id in org_ids:
+        client_ids = (
+            connection.execute(
+                insert(Client).returning(Client.id),
+                [
+                    {
+                        "name": f"client {i}",
+                        "email": f"client-{org_id}-{i}@example.com",
+                        "organization_id": org_id,
+                    }
+                    for i in range(rows)
+                ],
+            )
+            .scalars()
+            .all()
+        )
+        product_ids = (
+            connection.execute(
+                insert(Product).returning(Product.id),
+                [
+                    {
+                        "name": f"product {i}",
+                        "sku": f"SKU-{org_id}-{i}",
+                        "unit_price": 10,
+                        "organization_id": org_id,
+                    }
+                    for i in range(rows)
+                ],
+            )
+            .scalars()
+            .all()
+        )
+        invoice_ids = (
+            connection.execute(
+                insert(Invoice).returning(Invoice.id),
+                [
+                    {
+                        "invoice_number": f"BENCH-{org_id}-{i}",
+                        "status": random.choice(list(InvoiceStatus)),
+                        "issue_date": now - timedelta(days=random.randint(0, 365)),
+                        "due_date": now + timedelta(days=random.randint(-180, 60)),
+                        "subtotal": 30,
+                        "total": 30,
+                        "organization_id": org_id,
+                        "client_id": random.choice(client_ids),
+                    }
+                    for i in range(rows)
+                ],
+            )
+            .scalars()
+            .all()
+        )
+        connection.execute(
+            insert(InvoiceItem),
+            [
+                {
+                    "invoice_id": invoice_id,
+                    "product_id": random.choice(product_ids),
+                    "quantity": 1,
+                    "unit_price": 10,
+                    "subtotal": 10,
+                }
+                for invoice_id in invoice_ids
+                for _ in range(3)
+            ],
+        )
+
+    connection.execute(
+        text("ANALYZE clients, products, invoices, invoice_items, organizations")
+    )
+    return org_ids[len(org_ids) // 2]
+
+
+def tenant_queries(connection, org_id: int) -> dict:
+    """The hot queries issued by the client, product and invoice routes."""
+    client = connection.execute(
+        select(Client.id, Client.email).where(Client.organization_id == org_id)
+    ).first()
+    invoice_ids = (
+        connection.execute(
+            select(Invoice.id).where(Invoice.organization_id == org_id).limit(100)
+        )
+        .scalars()
+        .all()
+    )
+    return {
+        "client by id": select(Client).where(
+            Client.organization_id == org_id, Client.id == client.id
+        ),
+        "client by email": select(Client).where(
+            Client.organization_id == org_id, Client.email == client.email
+        ),
+        "clients page": select(Client)
+        .where(Client.organization_id == org_id, Client.id > client.id)
+        .order_by(Client.id)
+        .limit(100),
+        "products page": select(Product)
+        .where(Product.organization_id == org_id)
+        .order_by(Product.id)
+        .limit(100),
+        "invoices page": select(Invoice)
+        .where(Invoice.organization_id == org_id)
+        .order_by(Invoice.id)
+        .limit(100),
+        "overdue invoices": select(Invoice).where(
+            Invoice.organization_id == org_id,
+            Invoice.status == InvoiceStatus.PENDING,
+            Invoice.due_date < datetime.utcnow(),
+        ),
+        "items of an invoice page": select(InvoiceItem).where(
+            InvoiceItem.invoice_id.in_(invoice_ids)
+        ),
+    }
+
+
+def explain(connection, queries: dict) -> None:
+    for name, query in queries.items():
+        sql = query.compile(
+            dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"))
+        print(f"--- {name}")
+        for (line,) in plan:
+            print(f"    {line}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--organizations", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Query plans are only meaningful on PostgreSQL")
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            org_id = seed(connection, args.organizations, args.rows)
+            queries = tenant_queries(connection, org_id)
+
+            print("=== With composite tenant indexes")
+            explain(connection, queries)
+
+            for name in COMPOSITE_INDEXES:
+                connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            print("=== Without composite tenant indexes")
+            explain(connection, queries)
+        finally:
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import click
+from fastapi import HTTPException
+
+from config import SessionLocal, TOKEN_PURGE_BATCH_SIZE
+from models.enums import InvoiceStatus
+from utils.columnar import (
+    COLUMNAR_FORMATS,
+    COLUMNAR_TABLES,
+    arrow_schema,
+    columnar_export_query,
+    stream_columnar,
+)
+from utils.client_import import import_clients
+from utils.imports import IMPORT_FORMATS, parse_import_rows
+from utils.product_import import import_products
+from utils.replicas import replica_router
+from utils.retention import purge_expired_tokens
+from utils.rollups import rebuild_revenue_rollups
+
+
+@click.group()
+def cli():
+    """Ifiasoft ERP management commands"""
+
+
+@cli.command("purge-tokens")
+@click.option("--batch-size", default=TOKEN_PURGE_BATCH_SIZE, show_default=True)
+def purge_tokens(batch_size: int):
+    """Delete expired tokens and drop expired token partitions"""
+    result = purge_expired_tokens(batch_size=batch_size)
+    if result["skipped"]:
+        click.echo("Another purge is already running")
+        return
+
+    click.echo(f"Deleted {result['deleted']} tokens")
+    for name in result["dropped_partitions"]:
+        click.echo(f"Dropped partition {name}")
+
+
+@cli.command("export-invoices")
+@click.argument("organization_id", type=int)
+@click.argument("output", type=click.File("wb"))
+@click.option("--table", type=click.Choice(list(COLUMNAR_TABLES)), default="invoices")
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice(list(COLUMNAR_FORMATS)),
+    default="parquet",
+    show_default=True,
+)
+@click.option("--status", type=click.Choice([status.value for status in InvoiceStatus]))
+@click.option("--issued-from", type=click.DateTime())
+@click.option("--issued-to", type=click.DateTime())
+def export_invoices(
+    organization_id, output, table, export_format, status, issued_from, issued_to
+):
+    """Export an organization's invoices or items as Arrow or Parquet"""
+    query = columnar_export_query(
+        table,
+        organization_id,
+        InvoiceStatus(status) if status else None,
+        issued_from,
+        issued_to,
+    )
+    for chunk in stream_columnar(
+        replica_router.session_factory(), query, arrow_schema(table), export_format
+    ):
+        output.write(chunk)
+
+
+@cli.command("import-clients")
+@click.argument("organization_id", type=int)
+@click.argument("input", type=click.File("rb"))
+@click.option(
+    "--format",
+    "import_format",
+    type=click.Choice(list(IMPORT_FORMATS)),
+    default="csv",
+    show_default=True,
+)
+def import_client_file(organization_id, input, import_format):
+    """Create or update an organization's clients from a CSV or NDJSON file"""
+    with SessionLocal() as db:
+        try:
+            result = import_clients(
+                db, organization_id, parse_import_rows(input, import_format)
+            )
+        except HTTPException as exc:
+            raise click.ClickException(exc.detail)
+    for error in result["errors"]:
+        click.echo(f"Line {error['line']}: {error['error']}", err=True)
+    click.echo(
+        f"Created {result['created']} and updated {result['updated']} of "
+        f"{result['processed']} rows, {result['rejected']} rejected"
+    )
+
+
+@cli.command("import-products")
+@click.argument("organization_id", type=int)
+@click.argument("input", type=click.File("rb"))
+@click.option(
+    "--format",
+    "import_format",
+    type=click.Choice(list(IMPORT_FORMATS)),
+    default="csv",
+    show_default=True,
+)
+def import_product_file(organization_id, input, import_format):
+    """Create or update an organization's products from a CSV or NDJSON file"""
+    with SessionLocal() as db:
+        result = import_products(
+            db, organization_id, parse_import_rows(input, import_format)
+        )
+    for error in result["errors"]:
+        click.echo(f"Line {error['line']}: {error['error']}", err=True)
+    click.echo(
+        f"Imported {result['imported']} of {result['processed']} rows, "
+        f"{result['failed']} failed"
+    )
+
+
+@cli.command("rebuild-revenue-rollups")
+@click.option("--organization-id", type=int, help="Only rebuild this organization")
+def rebuild_revenue(organization_id):
+    """Recompute the revenue rollups from the invoices table"""
+    rows = rebuild_revenue_rollups(organization_id)
+    click.echo(f"Wrote {rows} revenue rollup rows")
+
+
+if __name__ == "__main__":
+    cli()
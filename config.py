@@ -3,18 +3,96 @@ import os
 from dotenv import load_dotenv
 from fastapi.security import HTTPBearer
 from passlib.context import CryptContext
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
 load_dotenv()
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# Connection pool, per worker process: keep
+# workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) below Postgres max_connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True") == "True"
+
+POOL_OPTIONS = {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": DB_POOL_PRE_PING,
+}
+
+engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, **POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read replicas for the GET endpoints, comma separated; reads go to the
+# primary when none are configured
+READ_REPLICA_URLS = [
+    url.strip() for url in os.getenv("READ_REPLICA_URLS", "").split(",") if url.strip()
+]
+# Keep a user's reads on the primary for this long after they commit a write,
+# so they are not served data older than their own changes
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+replica_engines = [
+    create_engine(url, poolclass=InstrumentedQueuePool, **POOL_OPTIONS)
+    for url in READ_REPLICA_URLS
+]
+ReplicaSessionLocals = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    for replica_engine in replica_engines
+]
+
+# Opt-in async stack; the sync engine stays available for everything else
+ASYNC_DATABASE_ENABLED = os.getenv("ASYNC_DATABASE_ENABLED", "False") == "True"
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def _async_database_url(url: str):
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        return url
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}")
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(
+    DATABASE_URL
+)
+
+async_engine = (
+    create_async_engine(
+        ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool, **POOL_OPTIONS
+    )
+    if ASYNC_DATABASE_ENABLED
+    else None
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+async_replica_engines = [
+    create_async_engine(
+        _async_database_url(url),
+        poolclass=InstrumentedAsyncQueuePool,
+        **POOL_OPTIONS,
+    )
+    for url in (READ_REPLICA_URLS if ASYNC_DATABASE_ENABLED else [])
+]
+AsyncReplicaSessionLocals = [
+    async_sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)
+    for replica_engine in async_replica_engines
+]
+
 Base = declarative_base()
 
 
@@ -27,11 +105,21 @@ def get_db():
         db.close()
 
 
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # Dependency for JWT token
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated pool for password hashing
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 32))
+
 # OAuth2 scheme
-oauth2_scheme = HTTPBearer
+oauth2_scheme = HTTPBearer()
 
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY")
@@ -39,6 +127,49 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
 
+# Auth context cache
+AUTH_CACHE_ENABLED = os.getenv("AUTH_CACHE_ENABLED", "True") == "True"
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", 10000))
+AUTH_CACHE_TTL_SECONDS = int(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+
+# Token revocation: "database" checks the tokens table on every request,
+# "stateless" checks the per-user epoch and the in-memory revocation list
+TOKEN_REVOCATION_MODE = os.getenv("TOKEN_REVOCATION_MODE", "database")
+
+# Expired token retention
+TOKEN_PURGE_SCHEDULE_ENABLED = (
+    os.getenv("TOKEN_PURGE_SCHEDULE_ENABLED", "False") == "True"
+)
+TOKEN_PURGE_INTERVAL_MINUTES = int(os.getenv("TOKEN_PURGE_INTERVAL_MINUTES", 60))
+TOKEN_PURGE_BATCH_SIZE = int(os.getenv("TOKEN_PURGE_BATCH_SIZE", 5000))
+TOKEN_PARTITION_MONTHS_AHEAD = int(os.getenv("TOKEN_PARTITION_MONTHS_AHEAD", 3))
+
+# Server-side invoice numbers: each worker reserves this many numbers per
+# organization at a time
+INVOICE_NUMBER_BLOCK_SIZE = int(os.getenv("INVOICE_NUMBER_BLOCK_SIZE", 100))
+INVOICE_NUMBER_FORMAT = os.getenv("INVOICE_NUMBER_FORMAT", "INV-{number:06d}")
+
+# Idempotency keys: responses are replayed for this long; a retry of a request
+# still in flight waits for it up to the lock timeout
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", 86400))
+IDEMPOTENCY_LOCK_SECONDS = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 30))
+IDEMPOTENCY_PURGE_INTERVAL_MINUTES = int(
+    os.getenv("IDEMPOTENCY_PURGE_INTERVAL_MINUTES", 60)
+)
+
+# Batched emails to organization admins about products that fell to their
+# reorder level since the last run
+LOW_STOCK_NOTIFICATIONS_ENABLED = (
+    os.getenv("LOW_STOCK_NOTIFICATIONS_ENABLED", "False") == "True"
+)
+LOW_STOCK_NOTIFY_INTERVAL_MINUTES = int(
+    os.getenv("LOW_STOCK_NOTIFY_INTERVAL_MINUTES", 15)
+)
+
+# Aging report snapshots are recomputed when older than this; snapshots of
+# organizations polled recently are refreshed in the background on this interval
+AGING_REPORT_REFRESH_SECONDS = int(os.getenv("AGING_REPORT_REFRESH_SECONDS", 60))
+
 # Email Configuration
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
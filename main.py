@@ -1,20 +1,83 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import ALLOWED_ORIGINS
+from config import (
+    AGING_REPORT_REFRESH_SECONDS,
+    ALLOWED_ORIGINS,
+    ASYNC_DATABASE_ENABLED,
+    IDEMPOTENCY_PURGE_INTERVAL_MINUTES,
+    LOW_STOCK_NOTIFICATIONS_ENABLED,
+    LOW_STOCK_NOTIFY_INTERVAL_MINUTES,
+    TOKEN_PURGE_INTERVAL_MINUTES,
+    TOKEN_PURGE_SCHEDULE_ENABLED,
+    TOKEN_REVOCATION_MODE,
+    async_engine,
+    async_replica_engines,
+)
 from routes import (
     auth_router,
     product_router,
     customer_router,
     invoice_router,
+    internal_router,
+    report_router,
 )
+from utils.aging import aging_reports
+from utils.idempotency import REPLAYED_HEADER, IdempotencyMiddleware, idempotency_store
+from utils.low_stock import notify_low_stock
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.retention import purge_expired_tokens
+from utils.revocation import revocation_list
+from utils.scheduler import scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if TOKEN_REVOCATION_MODE == "stateless":
+        revocation_list.start()
+    if TOKEN_PURGE_SCHEDULE_ENABLED:
+        scheduler.add_job(
+            "purge_expired_tokens",
+            TOKEN_PURGE_INTERVAL_MINUTES * 60,
+            purge_expired_tokens,
+        )
+    if LOW_STOCK_NOTIFICATIONS_ENABLED:
+        scheduler.add_job(
+            "notify_low_stock",
+            LOW_STOCK_NOTIFY_INTERVAL_MINUTES * 60,
+            notify_low_stock,
+        )
+    scheduler.add_job(
+        "refresh_aging_reports", AGING_REPORT_REFRESH_SECONDS, aging_reports.refresh
+    )
+    scheduler.add_job(
+        "purge_idempotency_keys",
+        IDEMPOTENCY_PURGE_INTERVAL_MINUTES * 60,
+        idempotency_store.purge,
+    )
+    scheduler.start()
+    yield
+    scheduler.stop()
+    revocation_list.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica_engine in async_replica_engines:
+        await replica_engine.dispose()
+
 
 app = FastAPI(
     title="Ifiasoft ERP APIs",
     version="0.1.0",
     description="API endpoints for Ifiasoft ERP system",
+    lifespan=lifespan,
 )
 
+# Retries of these creates with the same Idempotency-Key replay the first
+# response instead of creating duplicates
+app.add_middleware(IdempotencyMiddleware, paths=["/invoices", "/products", "/client"])
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -22,13 +85,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, REPLAYED_HEADER],
 )
 
 # Include routers
+if ASYNC_DATABASE_ENABLED:
+    from routes import aio
+
+    auth_router = aio.override_routes(auth_router, aio.auth_router)
+    product_router = aio.override_routes(product_router, aio.product_router)
+    customer_router = aio.override_routes(customer_router, aio.customer_router)
+    invoice_router = aio.override_routes(invoice_router, aio.invoice_router)
+
 app.include_router(auth_router)
 app.include_router(product_router)
 app.include_router(customer_router)
 app.include_router(invoice_router)
+app.include_router(report_router)
+app.include_router(internal_router)
 
 
 # Root endpoint
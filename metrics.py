@@ -0,0 +1,149 @@
+import bisect
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Upper bounds in seconds, from sub-millisecond waits to multi-second stalls
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """Thread-safe cumulative histogram of durations in seconds."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+            maximum = self._max
+
+        count = sum(counts)
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            buckets[f"le_{bound}"] = cumulative
+        buckets["le_inf"] = count
+
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+            "max": maximum,
+            "buckets": buckets,
+        }
+
+
+class PoolMetrics:
+    """Counters and histograms collected by ``InstrumentedQueuePool``."""
+
+    def __init__(self):
+        self.checkout_wait = Histogram()
+        self.checkout_hold = Histogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def snapshot(self, pool: Pool) -> dict:
+        return {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+            "in_use": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+            "checkout_hold_seconds": self.checkout_hold.snapshot(),
+        }
+
+
+class _InstrumentedPoolMixin:
+    """
+    Times how long callers wait for a connection and how long they hold it.
+
+    The wait is measured around ``_do_get``, which is where a checkout blocks
+    once every pooled and overflow connection is in use.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        # A recreated pool inherits the listeners of the pool it replaces
+        if "_dispatch" not in kwargs:
+            event.listen(self, "connect", self._on_connect)
+            event.listen(self, "checkout", self._on_checkout)
+            event.listen(self, "checkin", self._on_checkin)
+            event.listen(self, "invalidate", self._on_invalidate)
+
+    def recreate(self):
+        # Keep the history when the engine is disposed
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.checkout_wait.observe(time.perf_counter() - started)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        self.metrics.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        self.metrics.checkouts += 1
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            self.metrics.checkout_hold.observe(time.perf_counter() - checked_out_at)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        self.metrics.invalidations += 1
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
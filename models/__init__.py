@@ -2,3 +2,5 @@ from .client import Client
 from .invoice import Invoice
 from .product import Product
 from .user import User, Role, Token, Organization
+from .report import RevenueRollup
+from .idempotency import IdempotencyKey
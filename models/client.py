@@ -1,17 +1,23 @@
-import datetime
-
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from config import Base
+from .utils import utcnow
 
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        Index("ix_clients_organization_id_id", "organization_id", "id"),
+        # Emails are unique within an organization; client imports upsert on it
+        Index(
+            "ix_clients_organization_id_email", "organization_id", "email", unique=True
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(127), nullable=False)
-    email = Column(String(127), unique=True, index=True)
+    email = Column(String(127))
     phone = Column(String(20))
     address = Column(String(255))
     tax_number = Column(String(50))
@@ -23,9 +29,9 @@ class Client(Base):
     # Relationship with invoices
     invoices = relationship("Invoice", back_populates="client")
 
-    created_at = Column(DateTime, default=datetime.datetime.now(datetime.UTC))
+    created_at = Column(DateTime, default=utcnow)
     updated_at = Column(
         DateTime,
-        default=datetime.datetime.now(datetime.UTC),
-        onupdate=datetime.datetime.now(datetime.UTC),
+        default=utcnow,
+        onupdate=utcnow,
     )
@@ -6,3 +6,12 @@ class InvoiceStatus(str, enum.Enum):
     PENDING = "pending"
     PAID = "paid"
     CANCELLED = "cancelled"
+
+
+# Statuses an invoice may move to from each status
+INVOICE_STATUS_TRANSITIONS = {
+    InvoiceStatus.DRAFT: {InvoiceStatus.PENDING, InvoiceStatus.CANCELLED},
+    InvoiceStatus.PENDING: {InvoiceStatus.PAID, InvoiceStatus.CANCELLED},
+    InvoiceStatus.PAID: set(),
+    InvoiceStatus.CANCELLED: set(),
+}
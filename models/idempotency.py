@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String
+
+from config import Base
+from .utils import utcnow
+
+
+class IdempotencyKey(Base):
+    """
+    A request made with an ``Idempotency-Key`` header and, once it completed,
+    its response (see ``utils.idempotency``).
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # SHA-256 of the request's method, path and body
+    request_hash = Column(String(64), nullable=False)
+
+    # Null while the request is in flight
+    status_code = Column(Integer)
+    content_type = Column(String(127))
+    response_body = Column(LargeBinary)
+
+    created_at = Column(DateTime, default=utcnow)
+    # In-flight requests expire after the lock timeout, so a key whose request
+    # never completed can be claimed again
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,17 +1,42 @@
-import datetime
-
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    ForeignKey,
+    Enum,
+    Index,
+)
+from sqlalchemy.orm import relationship, synonym
 
 from config import Base
+from .utils import utcnow
 from .enums import InvoiceStatus
 
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Invoice numbers are unique within an organization
+        Index(
+            "ix_invoices_organization_id_invoice_number",
+            "organization_id",
+            "invoice_number",
+            unique=True,
+        ),
+        Index("ix_invoices_organization_id_id", "organization_id", "id"),
+        Index(
+            "ix_invoices_organization_id_status_due_date",
+            "organization_id",
+            "status",
+            "due_date",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    invoice_number = Column(String(50), unique=True, index=True)
+    invoice_number = Column(String(50))
     status = Column(Enum(InvoiceStatus), default=InvoiceStatus.DRAFT)
     issue_date = Column(DateTime, nullable=False)
     due_date = Column(DateTime, nullable=False)
@@ -26,15 +51,17 @@ class Invoice(Base):
 
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
     client = relationship("Client", back_populates="invoices")
+    # The API calls the client a customer
+    customer_id = synonym("client_id")
 
     # Define the items relationship explicitly
     items = relationship("InvoiceItem", back_populates="invoice")
 
-    created_at = Column(DateTime, default=datetime.datetime.now(datetime.UTC))
+    created_at = Column(DateTime, default=utcnow)
     updated_at = Column(
         DateTime,
-        default=datetime.datetime.now(datetime.UTC),
-        onupdate=datetime.datetime.now(datetime.UTC),
+        default=utcnow,
+        onupdate=utcnow,
     )
 
 
@@ -46,15 +73,24 @@ class InvoiceItem(Base):
     unit_price = Column(Float, nullable=False)
     subtotal = Column(Float, nullable=False)
 
-    invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=False)
+    invoice_id = Column(Integer, ForeignKey("invoices.id"), nullable=False, index=True)
     invoice = relationship("Invoice", back_populates="items")
 
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     product = relationship("Product", back_populates="invoice_items")
 
-    created_at = Column(DateTime, default=datetime.datetime.now(datetime.UTC))
+    created_at = Column(DateTime, default=utcnow)
     updated_at = Column(
         DateTime,
-        default=datetime.datetime.now(datetime.UTC),
-        onupdate=datetime.datetime.now(datetime.UTC),
+        default=utcnow,
+        onupdate=utcnow,
     )
+
+
+class InvoiceNumberCounter(Base):
+    """Next unreserved invoice number of each organization."""
+
+    __tablename__ = "invoice_number_counters"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    next_value = Column(BigInteger, nullable=False)
@@ -1,19 +1,50 @@
-import datetime
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy import (
+    Column,
+    func,
+    Integer,
+    String,
+    Float,
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    literal_column,
+    text,
+)
 from sqlalchemy.orm import relationship
 from config import Base
+from .utils import utcnow
 
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_organization_id_id", "organization_id", "id"),
+        # SKUs are unique within an organization; product imports upsert on it
+        Index("ix_products_organization_id_sku", "organization_id", "sku", unique=True),
+        # Only holds the products at or below their reorder level, so the
+        # database keeps the low-stock list current as stock moves
+        Index(
+            "ix_products_low_stock",
+            "organization_id",
+            "id",
+            postgresql_where=text("quantity_in_stock <= reorder_level"),
+            sqlite_where=text("quantity_in_stock <= reorder_level"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     description = Column(String(1000))
-    sku = Column(String(50), unique=True, index=True)
+    sku = Column(String(50))
     unit_price = Column(Float, nullable=False)
     quantity_in_stock = Column(Integer, default=0)
     reorder_level = Column(Integer, default=0)
+    # Whether the organization was told the product is low on stock; reset
+    # when its stock goes back above the reorder level
+    low_stock_notified = Column(
+        Boolean, default=False, server_default=text("false"), nullable=False
+    )
     is_active = Column(Boolean, default=True)
 
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
@@ -22,9 +53,31 @@ class Product(Base):
     # Add relationship to invoice items
     invoice_items = relationship("InvoiceItem", back_populates="product")
 
-    created_at = Column(DateTime, default=datetime.datetime.now(datetime.UTC))
+    created_at = Column(DateTime, default=utcnow)
     updated_at = Column(
         DateTime,
-        default=datetime.datetime.now(datetime.UTC),
-        onupdate=datetime.datetime.now(datetime.UTC),
+        default=utcnow,
+        onupdate=utcnow,
     )
+
+
+# Text matched by GET /products/search, trigram-indexed on Postgres (the
+# expression must stay in sync with the index's migration). The separators
+# are inline literals, not bind parameters, so queries render the same SQL
+# as the index expression and the planner can match them
+_SPACE = literal_column("' '", String)
+_EMPTY = literal_column("''", String)
+PRODUCT_SEARCH_TEXT = (
+    Product.name
+    + _SPACE
+    + func.coalesce(Product.sku, _EMPTY)
+    + _SPACE
+    + func.coalesce(Product.description, _EMPTY)
+)
+
+Index(
+    "ix_products_search_text",
+    PRODUCT_SEARCH_TEXT.label("search_text"),
+    postgresql_using="gin",
+    postgresql_ops={"search_text": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
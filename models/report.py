@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Date, Enum, Float, ForeignKey, Integer
+
+from config import Base
+from .enums import InvoiceStatus
+
+
+class RevenueRollup(Base):
+    """
+    Invoice totals per organization, issue month, client and status.
+
+    Maintained incrementally by the invoice write paths (see
+    ``utils.rollups``) and rebuilt from ``invoices`` by
+    ``cli.py rebuild-revenue-rollups``.
+    """
+
+    __tablename__ = "revenue_rollups"
+
+    organization_id = Column(Integer, ForeignKey("organizations.id"), primary_key=True)
+    # First day of the invoices' issue month
+    month = Column(Date, primary_key=True)
+    client_id = Column(Integer, ForeignKey("clients.id"), primary_key=True)
+    status = Column(Enum(InvoiceStatus), primary_key=True)
+
+    invoice_count = Column(Integer, nullable=False, default=0)
+    subtotal = Column(Float, nullable=False, default=0)
+    tax_amount = Column(Float, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0)
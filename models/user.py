@@ -1,10 +1,10 @@
-import datetime
 import uuid
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from config import Base
+from .utils import utcnow
 
 
 class Organization(Base):
@@ -19,11 +19,11 @@ class Organization(Base):
     website = Column(String(127))
     is_active = Column(Boolean, default=True)
 
-    created_at = Column(DateTime, default=datetime.datetime.now(datetime.UTC))
+    created_at = Column(DateTime, default=utcnow)
     updated_at = Column(
         DateTime,
-        default=datetime.datetime.now(datetime.UTC),
-        onupdate=datetime.datetime.now(datetime.UTC),
+        default=utcnow,
+        onupdate=utcnow,
     )
 
     # Relationships
@@ -50,12 +50,14 @@ class User(Base):
     email_verification_token = Column(
         String(36), unique=True, default=lambda: str(uuid.uuid4())
     )
+    # Bumped on logout to invalidate every token issued before it
+    token_epoch = Column(Integer, default=0, server_default="0", nullable=False)
 
-    created_at = Column(DateTime, default=datetime.datetime.now(datetime.UTC))
+    created_at = Column(DateTime, default=utcnow)
     updated_at = Column(
         DateTime,
-        default=datetime.datetime.now(datetime.UTC),
-        onupdate=datetime.datetime.now(datetime.UTC),
+        default=utcnow,
+        onupdate=utcnow,
     )
 
     role_id = Column(Integer, ForeignKey("roles.id"))
@@ -73,26 +75,32 @@ class Role(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     permissions = Column(String)
-    created_at = Column(DateTime, default=datetime.datetime.now(datetime.UTC))
+    created_at = Column(DateTime, default=utcnow)
     updated_at = Column(
         DateTime,
-        default=datetime.datetime.now(datetime.UTC),
-        onupdate=datetime.datetime.now(datetime.UTC),
+        default=utcnow,
+        onupdate=utcnow,
     )
 
     users = relationship("User", back_populates="role")
 
 
 class Token(Base):
+    # On Postgres this table is range-partitioned by month on expires_at (see
+    # migration 91c954289b4c): its primary key is (id, expires_at) there, and
+    # jti is only indexed, not unique, since unique constraints of a
+    # partitioned table must include the partition key. The mapping keeps id
+    # as the sole primary key so that it stays autoincrementing on SQLite.
     __tablename__ = "tokens"
+    __table_args__ = (Index("ix_tokens_jti", "jti"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    jti = Column(String(36), unique=True, index=True)
+    jti = Column(String(36))
     token_type = Column(String(10))
     user_id = Column(Integer, ForeignKey("users.id"))
     revoked = Column(Boolean, default=False)
-    expires_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.datetime.now(datetime.UTC))
+    expires_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=utcnow)
 
     # Relationship
     user = relationship("User", back_populates="tokens")
@@ -0,0 +1,6 @@
+import datetime
+
+
+def utcnow() -> datetime.datetime:
+    """Current UTC time as a naive datetime, matching the DateTime columns."""
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
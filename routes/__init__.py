@@ -1,4 +1,6 @@
 from .auth import router as auth_router
 from .client import router as customer_router
+from .internal import router as internal_router
 from .invoice import router as invoice_router
 from .product import router as product_router
+from .report import router as report_router
@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from .auth import router as auth_router
+from .client import router as customer_router
+from .invoice import router as invoice_router
+from .product import router as product_router
+
+
+def override_routes(base: APIRouter, overrides: APIRouter) -> APIRouter:
+    """
+    Return a router with ``base``'s routes, replacing those that ``overrides``
+    defines for the same path and methods.
+
+    Routes keep ``base``'s declaration order, so static paths such as
+    ``/invoices/bulk`` still take precedence over ``/invoices/{invoice_id}``.
+    """
+    replacements = {
+        (route.path, frozenset(route.methods)): route for route in overrides.routes
+    }
+    merged = APIRouter()
+    for route in base.routes:
+        merged.routes.append(
+            replacements.pop((route.path, frozenset(route.methods)), route)
+        )
+    merged.routes.extend(replacements.values())
+    return merged
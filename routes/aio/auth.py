@@ -0,0 +1,78 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_async_db
+from models.user import User
+from routes import auth
+from schemas.request import UserLogin, UserCreate, RefreshToken
+from schemas.response import UserAuthResponse, TokenResponse, UserResponse
+from utils import UserContext, password_hasher
+from utils.auth import get_current_user_async
+
+router = APIRouter(prefix="/auth", tags=["Authentication & User"])
+
+
+@router.post("/register", response_model=UserAuthResponse, status_code=201)
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    db_user = await db.run_sync(auth._get_user_by_email, user.email)
+    if db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    hashed_password = await password_hasher.hash(user.password)
+    db_user = User(
+        email=user.email,
+        password=hashed_password,
+        first_name=user.first_name,
+        middle_name=user.middle_name,
+        last_name=user.last_name,
+    )
+    return await db.run_sync(auth._register_user, db_user)
+
+
+@router.post("/token", response_model=UserAuthResponse)
+async def login_for_access_token(
+    request_data: UserLogin, db: AsyncSession = Depends(get_async_db)
+):
+    user = await db.run_sync(auth._get_user_by_email, request_data.email)
+    if not user or not await password_hasher.verify(
+        request_data.password, user.password
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if not user.is_email_verified:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Email not verified",
+        )
+
+    return await db.run_sync(auth._auth_response, user)
+
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_token(
+    token_data: RefreshToken,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(lambda session: auth.refresh_token(token_data, db=session))
+
+
+@router.post("/logout")
+async def logout(
+    current_user: UserContext = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.run_sync(
+        lambda session: auth.logout(current_user=current_user, db=session)
+    )
+
+
+@router.get("/user/me", response_model=UserResponse)
+async def read_user_me(
+    current_user: UserContext = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await db.get(User, current_user.id)
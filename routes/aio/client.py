@@ -0,0 +1,112 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_async_db
+from routes import client as handlers
+from schemas.request import ClientBulkImport, ClientCreate, ClientUpdate
+from schemas.response import ClientImportResponse, ClientResponse
+from utils import UserContext
+from utils.auth import get_current_user_async
+from utils.replicas import get_async_read_db
+
+router = APIRouter(prefix="/client", tags=["Client"])
+
+# Each handler runs the sync implementation through AsyncSession.run_sync, so
+# the queries are awaited on the event loop instead of parking a thread.
+# POST /client/import is left to the sync route: parsing the upload would
+# hold the event loop, so it runs in the threadpool instead
+
+
+@router.get("", response_model=List[ClientResponse])
+async def get_clients(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserContext = Depends(get_current_user_async),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+):
+    """Get all clients for the current user's organization"""
+    return await db.run_sync(
+        lambda session: handlers.get_clients(
+            response,
+            db=session,
+            current_user=current_user,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    )
+
+
+@router.get("/{client_id}", response_model=ClientResponse)
+async def get_client(
+    client_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Get a specific client by ID"""
+    return await db.run_sync(
+        lambda session: handlers.get_client(
+            client_id, db=session, current_user=current_user
+        )
+    )
+
+
+@router.post("", response_model=ClientResponse)
+async def create_client(
+    client: ClientCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Create a new client"""
+    return await db.run_sync(
+        lambda session: handlers.create_client(
+            client, db=session, current_user=current_user
+        )
+    )
+
+
+@router.post("/bulk", response_model=ClientImportResponse)
+async def import_client_batch(
+    batch: ClientBulkImport,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Create or update up to 50000 clients at once, matched by email"""
+    return await db.run_sync(
+        lambda session: handlers.import_client_batch(
+            batch, db=session, current_user=current_user
+        )
+    )
+
+
+@router.patch("/{client_id}", response_model=ClientResponse)
+async def update_client(
+    client_id: int,
+    client: ClientUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Update a client"""
+    return await db.run_sync(
+        lambda session: handlers.update_client(
+            client_id, client, db=session, current_user=current_user
+        )
+    )
+
+
+@router.delete("/{client_id}")
+async def delete_client(
+    client_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Delete a client"""
+    return await db.run_sync(
+        lambda session: handlers.delete_client(
+            client_id, db=session, current_user=current_user
+        )
+    )
@@ -0,0 +1,138 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_async_db
+from routes import invoice as handlers
+from schemas.request import (
+    InvoiceBulkCreate,
+    InvoiceCreate,
+    InvoiceStatusUpdate,
+    InvoiceUpdate,
+)
+from schemas.response import (
+    InvoiceBulkResponse,
+    InvoiceResponse,
+    InvoiceStatusUpdateResponse,
+)
+from utils import UserContext
+from utils.auth import get_current_user_async
+from utils.replicas import get_async_read_db
+
+router = APIRouter(prefix="/invoices", tags=["Invoices"])
+
+# Invoices are serialized inside run_sync: loading their items lazily after
+# the greenlet has returned would fail on an async session
+
+
+@router.get("", response_model=List[InvoiceResponse])
+async def get_invoices(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserContext = Depends(get_current_user_async),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+):
+    """Get all invoices for the current user's organization"""
+    return await db.run_sync(
+        lambda session: [
+            InvoiceResponse.model_validate(invoice)
+            for invoice in handlers.get_invoices(
+                response,
+                db=session,
+                current_user=current_user,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+            )
+        ]
+    )
+
+
+@router.get("/{invoice_id}", response_model=InvoiceResponse)
+async def get_invoice(
+    invoice_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Get a specific invoice by ID"""
+    return await db.run_sync(
+        lambda session: InvoiceResponse.model_validate(
+            handlers.get_invoice(invoice_id, db=session, current_user=current_user)
+        )
+    )
+
+
+@router.post("", response_model=InvoiceResponse)
+async def create_invoice(
+    invoice: InvoiceCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Create a new invoice with items"""
+    return await db.run_sync(
+        lambda session: InvoiceResponse.model_validate(
+            handlers.create_invoice(invoice, db=session, current_user=current_user)
+        )
+    )
+
+
+@router.post("/bulk", response_model=InvoiceBulkResponse)
+async def create_invoices_bulk(
+    payload: InvoiceBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Create a batch of invoices in one transaction"""
+    return await db.run_sync(
+        lambda session: handlers.create_invoices_bulk(
+            payload, db=session, current_user=current_user
+        )
+    )
+
+
+@router.post("/status", response_model=InvoiceStatusUpdateResponse)
+async def update_invoice_statuses(
+    payload: InvoiceStatusUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Move a batch of invoices to a new status"""
+    return await db.run_sync(
+        lambda session: handlers.update_invoice_statuses(
+            payload, db=session, current_user=current_user
+        )
+    )
+
+
+@router.patch("/{invoice_id}", response_model=InvoiceResponse)
+async def update_invoice(
+    invoice_id: int,
+    invoice: InvoiceUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Update an invoice"""
+    return await db.run_sync(
+        lambda session: InvoiceResponse.model_validate(
+            handlers.update_invoice(
+                invoice_id, invoice, db=session, current_user=current_user
+            )
+        )
+    )
+
+
+@router.delete("/{invoice_id}")
+async def delete_invoice(
+    invoice_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Delete an invoice"""
+    return await db.run_sync(
+        lambda session: handlers.delete_invoice(
+            invoice_id, db=session, current_user=current_user
+        )
+    )
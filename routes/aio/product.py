@@ -0,0 +1,135 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import get_async_db
+from routes import product as handlers
+from schemas.request import ProductCreate, ProductUpdate
+from schemas.response import ProductResponse
+from utils import UserContext
+from utils.auth import get_current_user_async
+from utils.replicas import get_async_read_db
+
+router = APIRouter(prefix="/products", tags=["Products"])
+
+# Each handler runs the sync implementation through AsyncSession.run_sync, so
+# the queries are awaited on the event loop instead of parking a thread.
+# POST /products/import is left to the sync route: parsing the upload would
+# hold the event loop, so it runs in the threadpool instead
+
+
+@router.get("", response_model=List[ProductResponse])
+async def get_products(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserContext = Depends(get_current_user_async),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+):
+    """Get all products for the current user's organization"""
+    return await db.run_sync(
+        lambda session: handlers.get_products(
+            response,
+            db=session,
+            current_user=current_user,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    )
+
+
+@router.get("/low-stock", response_model=List[ProductResponse])
+async def get_low_stock_products(
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserContext = Depends(get_current_user_async),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+):
+    """Get the organization's products at or below their reorder level"""
+    return await db.run_sync(
+        lambda session: handlers.get_low_stock_products(
+            response,
+            db=session,
+            current_user=current_user,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    )
+
+
+@router.get("/search", response_model=List[ProductResponse])
+async def search_product_catalog(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Search the organization's products by name, SKU or description"""
+    return await db.run_sync(
+        lambda session: handlers.search_product_catalog(
+            q=q, limit=limit, db=session, current_user=current_user
+        )
+    )
+
+
+@router.get("/{product_id}", response_model=ProductResponse)
+async def get_product(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Get a specific product by ID"""
+    return await db.run_sync(
+        lambda session: handlers.get_product(
+            product_id, db=session, current_user=current_user
+        )
+    )
+
+
+@router.post("", response_model=ProductResponse)
+async def create_product(
+    product: ProductCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Create a new product"""
+    return await db.run_sync(
+        lambda session: handlers.create_product(
+            product, db=session, current_user=current_user
+        )
+    )
+
+
+@router.patch("/{product_id}", response_model=ProductResponse)
+async def update_product(
+    product_id: int,
+    product: ProductUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Update a product"""
+    return await db.run_sync(
+        lambda session: handlers.update_product(
+            product_id, product, db=session, current_user=current_user
+        )
+    )
+
+
+@router.delete("/{product_id}")
+async def delete_product(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    """Delete a product"""
+    return await db.run_sync(
+        lambda session: handlers.delete_product(
+            product_id, db=session, current_user=current_user
+        )
+    )
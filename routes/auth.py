@@ -2,36 +2,38 @@ from datetime import datetime
 
 import jwt
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
-from config import get_db, SECRET_KEY, ALGORITHM
+from config import get_db, SECRET_KEY, ALGORITHM, TOKEN_REVOCATION_MODE
 from models.user import User, Token
 from schemas.request import UserLogin, UserCreate, RefreshToken
 from schemas.response import UserAuthResponse, TokenResponse, UserResponse
 from utils import (
-    verify_password,
-    get_password_hash,
     get_current_user,
+    UserContext,
+    auth_cache,
+    password_hasher,
 )
 from utils.auth import create_tokens
+from utils.revocation import revocation_list
 
 router = APIRouter(prefix="/auth", tags=["Authentication & User"])
 
 
-@router.post("/register", response_model=UserAuthResponse, status_code=201)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
+def _get_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
 
-    hashed_password = get_password_hash(user.password)
-    db_user = User(
-        email=user.email,
-        password=hashed_password,
-        first_name=user.first_name,
-        middle_name=user.middle_name,
-        last_name=user.last_name,
-    )
+
+def _auth_response(db: Session, user: User) -> dict:
+    tokens = create_tokens(user.id, db)
+    # Serialized here, since the commit expired the user and loading it again
+    # while the response is rendered would block the event loop
+    return {"user": UserResponse.model_validate(user), "token": tokens}
+
+
+def _register_user(db: Session, db_user: User) -> dict:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
@@ -42,18 +44,36 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     # )
 
     # Create tokens
-    tokens = create_tokens(db_user.id, db)
+    return _auth_response(db, db_user)
 
-    return {
-        "user": db_user,
-        "token": tokens,
-    }
+
+# Password hashing runs on its own bounded pool, so these handlers are async
+# and hand the database work to the threadpool in between
+@router.post("/register", response_model=UserAuthResponse, status_code=201)
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(_get_user_by_email, db, user.email)
+    if db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    hashed_password = await password_hasher.hash(user.password)
+    db_user = User(
+        email=user.email,
+        password=hashed_password,
+        first_name=user.first_name,
+        middle_name=user.middle_name,
+        last_name=user.last_name,
+    )
+    return await run_in_threadpool(_register_user, db, db_user)
 
 
 @router.post("/token", response_model=UserAuthResponse)
-def login_for_access_token(request_data: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == request_data.email).first()
-    if not user or not verify_password(request_data.password, user.password):
+async def login_for_access_token(
+    request_data: UserLogin, db: Session = Depends(get_db)
+):
+    user = await run_in_threadpool(_get_user_by_email, db, request_data.email)
+    if not user or not await password_hasher.verify(
+        request_data.password, user.password
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -66,11 +86,8 @@ def login_for_access_token(request_data: UserLogin, db: Session = Depends(get_db
             detail="Email not verified",
         )
 
-    tokens = create_tokens(user.id, db)
-    return {
-        "user": user,
-        "token": tokens,
-    }
+    return await run_in_threadpool(_auth_response, db, user)
+
 
 @router.post("/refresh", response_model=TokenResponse)
 def refresh_token(
@@ -90,14 +107,17 @@ def refresh_token(
                 detail="Invalid refresh token",
             )
 
-        # Verify refresh token in database
+        # Verify refresh token in database, rejecting tokens issued before
+        # the user's last logout
         token_record = (
             db.query(Token)
+            .join(User, User.id == Token.user_id)
             .filter(
                 Token.jti == jti,
                 Token.token_type == "refresh",
                 Token.revoked == False,
                 Token.expires_at > datetime.utcnow(),
+                User.token_epoch <= payload.get("epoch", 0),
             )
             .first()
         )
@@ -110,10 +130,13 @@ def refresh_token(
 
         # Revoke the old refresh token
         token_record.revoked = True
+        if TOKEN_REVOCATION_MODE == "stateless":
+            revocation_list.revoke(db, jti, token_record.expires_at)
         db.commit()
+        auth_cache.invalidate(jti)
 
         # Create new tokens
-        tokens = create_tokens(user_id, db)
+        tokens = create_tokens(int(user_id), db)
 
         return tokens
     except jwt.PyJWTError:
@@ -125,16 +148,27 @@ def refresh_token(
 
 @router.post("/logout")
 def logout(
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    # Revoke all user's active tokens
-    db.query(Token).filter(
-        Token.user_id == current_user.id,
-        Token.revoked == False,
-        Token.expires_at > datetime.utcnow(),
-    ).update({"revoked": True})
+    if TOKEN_REVOCATION_MODE == "stateless":
+        # Every token issued before the bump now carries a stale epoch
+        epoch = db.execute(
+            update(User)
+            .where(User.id == current_user.id)
+            .values(token_epoch=User.token_epoch + 1)
+            .returning(User.token_epoch)
+        ).scalar_one()
+        revocation_list.bump_epoch(db, current_user.id, epoch)
+    else:
+        # Revoke all user's active tokens
+        db.query(Token).filter(
+            Token.user_id == current_user.id,
+            Token.revoked == False,
+            Token.expires_at > datetime.utcnow(),
+        ).update({"revoked": True})
     db.commit()
+    auth_cache.invalidate_user(current_user.id)
 
     return {"message": "Successfully logged out"}
 
@@ -159,10 +193,13 @@ def verify_email(
 
 
 @router.get("/user/me", response_model=UserResponse)
-def read_user_me(current_user: User = Depends(get_current_user)):
-    return current_user
+def read_user_me(
+    current_user: UserContext = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    return db.get(User, current_user.id)
 
 
 @router.delete("/user/", responses={}, status_code=204)
-def read_user_me(current_user: User = Depends(get_current_user)):
+def read_user_me(current_user: UserContext = Depends(get_current_user)):
     return
@@ -1,41 +1,42 @@
-from typing import List
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile
 from sqlalchemy.orm import Session
 
 from models.client import Client
-from models.user import User
-from schemas.request import ClientCreate, ClientUpdate
-from schemas.response import ClientResponse
-from utils import get_current_user
+from schemas.request import ClientBulkImport, ClientCreate, ClientUpdate
+from schemas.response import ClientImportResponse, ClientResponse
+from utils import UserContext, get_current_user
 from utils.auth import get_db
+from utils.client_import import import_clients
+from utils.imports import parse_import_rows
+from utils.pagination import paginate
+from utils.replicas import get_read_db
 
 router = APIRouter(prefix="/client", tags=["Client"])
 
 
 @router.get("", response_model=List[ClientResponse])
 def get_clients(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: UserContext = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
     """Get all clients for the current user's organization"""
-    clients = (
-        db.query(Client)
-        .filter(Client.organization_id == current_user.organization_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = db.query(Client).filter(
+        Client.organization_id == current_user.organization_id
     )
-    return clients
+    return paginate(query, Client.id, response, cursor, skip, limit)
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
 def get_client(
     client_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Get a specific client by ID"""
     client = (
@@ -55,7 +56,7 @@ def get_client(
 def create_client(
     client: ClientCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Create a new client"""
     # Check if email is already registered in the organization
@@ -81,12 +82,48 @@ def create_client(
     return db_client
 
 
+@router.post("/bulk", response_model=ClientImportResponse)
+def import_client_batch(
+    batch: ClientBulkImport,
+    db: Session = Depends(get_db),
+    current_user: UserContext = Depends(get_current_user),
+):
+    """
+    Create or update up to 50000 clients at once, matched by email.
+
+    Invalid clients are rejected individually and reported by their
+    position in the list, starting at 1; the others are written in a single
+    transaction.
+    """
+    return import_clients(
+        db, current_user.organization_id, enumerate(batch.clients, start=1)
+    )
+
+
+@router.post("/import", response_model=ClientImportResponse)
+def import_client_file(
+    file: UploadFile,
+    format: Literal["csv", "ndjson"] = "csv",
+    db: Session = Depends(get_db),
+    current_user: UserContext = Depends(get_current_user),
+):
+    """
+    Create or update clients from a CSV or NDJSON file, matched by email.
+
+    Invalid rows are rejected and reported by line number; the others are
+    written in a single transaction.
+    """
+    return import_clients(
+        db, current_user.organization_id, parse_import_rows(file.file, format)
+    )
+
+
 @router.patch("/{client_id}", response_model=ClientResponse)
 def update_client(
     client_id: int,
     client: ClientUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Update a client"""
     db_client = (
@@ -128,7 +165,7 @@ def update_client(
 def delete_client(
     client_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Delete a client"""
     db_client = (
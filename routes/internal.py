@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException
+
+from config import async_engine, async_replica_engines, engine, replica_engines
+from utils import UserContext, auth_cache, get_current_user, password_hasher
+from utils.aging import aging_reports
+from utils.idempotency import idempotency_store
+from utils.numbering import invoice_numbers
+from utils.replicas import async_replica_router, replica_router
+from utils.revocation import revocation_list
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+
+def require_admin(current_user: UserContext = Depends(get_current_user)):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
+def _pool_stats() -> dict:
+    pools = {"primary": engine.pool}
+    if async_engine is not None:
+        pools["primary_async"] = async_engine.pool
+    for index, replica_engine in enumerate(replica_engines):
+        pools[f"replica_{index}"] = replica_engine.pool
+    for index, replica_engine in enumerate(async_replica_engines):
+        pools[f"replica_{index}_async"] = replica_engine.pool
+    return {name: pool.metrics.snapshot(pool) for name, pool in pools.items()}
+
+
+@router.get("/metrics")
+def get_metrics(current_user: UserContext = Depends(require_admin)):
+    """Get in-process runtime metrics for this worker"""
+    return {
+        "db_pool": _pool_stats(),
+        "read_routing": {
+            "sync": replica_router.stats(),
+            "async": async_replica_router.stats(),
+        },
+        "auth_cache": auth_cache.stats(),
+        "revocation_list": revocation_list.stats(),
+        "password_hasher": password_hasher.stats(),
+        "aging_reports": aging_reports.stats(),
+        "idempotency": idempotency_store.stats(),
+        "invoice_numbers": invoice_numbers.stats(),
+    }
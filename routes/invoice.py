@@ -1,39 +1,161 @@
-from typing import List
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from models.client import Client
+from models.enums import INVOICE_STATUS_TRANSITIONS, InvoiceStatus
 from models.invoice import Invoice, InvoiceItem
-from models.user import User
-from schemas.request import InvoiceCreate, InvoiceUpdate
-from schemas.response import InvoiceResponse
-from utils import get_current_user
+from models.product import Product
+from schemas.request import (
+    InvoiceBulkCreate,
+    InvoiceCreate,
+    InvoiceItemUpdate,
+    InvoiceStatusUpdate,
+    InvoiceUpdate,
+)
+from schemas.response import (
+    InvoiceBulkResponse,
+    InvoiceBulkResult,
+    InvoiceResponse,
+    InvoiceStatusSkip,
+    InvoiceStatusUpdateResponse,
+)
+from utils import UserContext, get_current_user
+from utils.aging import aging_reports
 from utils.auth import get_db
+from utils.pagination import paginate
+from utils.columnar import (
+    COLUMNAR_FORMATS,
+    arrow_schema,
+    columnar_export_query,
+    stream_columnar,
+)
+from utils.export import (
+    invoice_export_query,
+    stream_export_rows,
+    to_csv,
+    to_ndjson,
+)
+from utils.numbering import invoice_numbers
+from utils.replicas import get_read_db, replica_router
+from utils.rollups import (
+    REVENUE_FIELDS,
+    RevenueDeltas,
+    record_revenue_change,
+    revenue_values,
+)
+from utils.stock import holds_stock, release_stock, reserve_stock
 
 router = APIRouter(prefix="/invoices", tags=["Invoices"])
 
+GENERATED_NUMBER_ERROR = (
+    "Invoice numbers like "
+    f"{invoice_numbers.number_format.format(number=1)} are assigned by the "
+    "server, leave invoice_number unset"
+)
+INVOICE_CONFLICT = (
+    "The invoice number is already taken, or a referenced record does not exist"
+)
+
 
 @router.get("", response_model=List[InvoiceResponse])
 def get_invoices(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: UserContext = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
     """Get all invoices for the current user's organization"""
-    invoices = db.query(Invoice).offset(skip).limit(limit).all()
-    return invoices
+    # Items for the whole page are loaded with a single IN query
+    query = (
+        db.query(Invoice)
+        .options(selectinload(Invoice.items))
+        .filter(Invoice.organization_id == current_user.organization_id)
+    )
+    return paginate(query, Invoice.id, response, cursor, skip, limit)
+
+
+@router.get("/export")
+def export_invoices(
+    current_user: UserContext = Depends(get_current_user),
+    format: Literal["csv", "ndjson"] = "csv",
+    status: InvoiceStatus | None = None,
+    issued_from: datetime | None = None,
+    issued_to: datetime | None = None,
+):
+    """
+    Export the organization's invoices with their line items.
+
+    Rows are streamed from a server-side cursor as they are encoded, so
+    memory use does not grow with the size of the export. CSV has one row
+    per line item; NDJSON has one invoice per line with its items nested.
+    """
+    query = invoice_export_query(
+        current_user.organization_id, status, issued_from, issued_to
+    )
+    batches = stream_export_rows(replica_router.session_factory(current_user.id), query)
+    if format == "csv":
+        content, media_type = to_csv(batches), "text/csv"
+    else:
+        content, media_type = to_ndjson(batches), "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="invoices.{format}"'},
+    )
+
+
+@router.get("/export/{table}")
+def export_invoices_columnar(
+    table: Literal["invoices", "items"],
+    current_user: UserContext = Depends(get_current_user),
+    format: Literal["arrow", "parquet"] = "parquet",
+    status: InvoiceStatus | None = None,
+    issued_from: datetime | None = None,
+    issued_to: datetime | None = None,
+):
+    """
+    Export the organization's invoices or invoice items as an Arrow IPC or
+    Parquet file.
+
+    The file is written and streamed one record batch at a time, so memory
+    use stays bounded however many rows are exported.
+    """
+    query = columnar_export_query(
+        table, current_user.organization_id, status, issued_from, issued_to
+    )
+    content = stream_columnar(
+        replica_router.session_factory(current_user.id),
+        query,
+        arrow_schema(table),
+        format,
+    )
+    return StreamingResponse(
+        content,
+        media_type=COLUMNAR_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
 
 
 @router.get("/{invoice_id}", response_model=InvoiceResponse)
 def get_invoice(
     invoice_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Get a specific invoice by ID"""
     invoice = (
         db.query(Invoice)
+        .options(selectinload(Invoice.items))
         .filter(
             Invoice.id == invoice_id,
             Invoice.organization_id == current_user.organization_id,
@@ -49,46 +171,205 @@ def get_invoice(
 def create_invoice(
     invoice: InvoiceCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
-    """Create a new invoice with items"""
-    # Calculate totals
-    subtotal = sum(item.quantity * item.unit_price for item in invoice.items)
-    tax_amount = subtotal * invoice.tax_rate if invoice.tax_rate else 0
-    total = subtotal + tax_amount
-
-    # Create invoice
-    db_invoice = Invoice(
-        invoice_number=invoice.invoice_number,
-        status=invoice.status,
-        issue_date=invoice.issue_date,
-        due_date=invoice.due_date,
-        subtotal=subtotal,
-        tax_rate=invoice.tax_rate,
-        tax_amount=tax_amount,
-        total=total,
-        notes=invoice.notes,
-        customer_id=invoice.customer_id,
-        organization_id=current_user.organization_id,
+    """
+    Create a new invoice with items.
+
+    The invoice and its items are written in one transaction with two INSERT
+    ... RETURNING statements, and the response is built from the returned
+    rows instead of reloading them. A pending or paid invoice takes its items
+    out of stock.
+    """
+    _check_invoice_number(invoice.invoice_number)
+    invoice_number = (
+        invoice.invoice_number
+        or invoice_numbers.allocate(current_user.organization_id)[0]
     )
-    db.add(db_invoice)
+    values = _invoice_values(invoice, current_user.organization_id, invoice_number)
+    try:
+        db_invoice = db.scalars(insert(Invoice).returning(Invoice), [values]).one()
+        items = []
+        if invoice.items:
+            items = db.scalars(
+                insert(InvoiceItem).returning(
+                    InvoiceItem, sort_by_parameter_order=True
+                ),
+                _item_values(db_invoice.id, invoice.items),
+            ).all()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=INVOICE_CONFLICT)
+    if holds_stock(invoice.status):
+        reserve_stock(db, current_user.organization_id, [db_invoice.id])
+    set_committed_value(db_invoice, "items", items)
+    record_revenue_change(db, after=values)
+
+    # Serialize before the commit expires the loaded attributes
+    response = InvoiceResponse.model_validate(db_invoice)
     db.commit()
-    db.refresh(db_invoice)
+    aging_reports.invalidate(current_user.organization_id)
+    return response
+
 
-    # Create invoice items
-    for item in invoice.items:
-        db_item = InvoiceItem(
-            invoice_id=db_invoice.id,
-            product_id=item.product_id,
-            quantity=item.quantity,
-            unit_price=item.unit_price,
-            subtotal=item.quantity * item.unit_price,
+@router.post("/bulk", response_model=InvoiceBulkResponse)
+def create_invoices_bulk(
+    payload: InvoiceBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: UserContext = Depends(get_current_user),
+):
+    """
+    Create a batch of invoices in one transaction.
+
+    The batch is validated up front with one query per referenced table.
+    Invoices that fail validation are reported in the results and skipped;
+    the others are inserted with one multi-row statement for the invoices and
+    one for all of their items, and the stock of all of their items is
+    reserved with one UPDATE.
+    """
+    invoices = payload.invoices
+    errors = _validate_invoice_batch(db, invoices, current_user.organization_id)
+    valid = [
+        (index, invoice)
+        for index, invoice in enumerate(invoices)
+        if index not in errors
+    ]
+
+    ids = {}
+    numbers = {index: invoice.invoice_number for index, invoice in valid}
+    if valid:
+        missing = [index for index, number in numbers.items() if number is None]
+        generated = invoice_numbers.allocate(current_user.organization_id, len(missing))
+        numbers.update(zip(missing, generated))
+        invoice_values = [
+            _invoice_values(invoice, current_user.organization_id, numbers[index])
+            for index, invoice in valid
+        ]
+        deltas = RevenueDeltas()
+        for values in invoice_values:
+            deltas.add(values)
+        try:
+            invoice_ids = db.scalars(
+                insert(Invoice).returning(Invoice.id, sort_by_parameter_order=True),
+                invoice_values,
+            ).all()
+            item_values = [
+                values
+                for invoice_id, (_, invoice) in zip(invoice_ids, valid)
+                for values in _item_values(invoice_id, invoice.items)
+            ]
+            if item_values:
+                db.execute(insert(InvoiceItem), item_values)
+            reserve_stock(
+                db,
+                current_user.organization_id,
+                [
+                    invoice_id
+                    for invoice_id, (_, invoice) in zip(invoice_ids, valid)
+                    if holds_stock(invoice.status)
+                ],
+            )
+            deltas.apply(db)
+            db.commit()
+            aging_reports.invalidate(current_user.organization_id)
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="The batch conflicts with a concurrent change, retry it",
+            )
+        ids = {index: invoice_id for (index, _), invoice_id in zip(valid, invoice_ids)}
+
+    return InvoiceBulkResponse(
+        created=len(ids),
+        failed=len(errors),
+        results=[
+            InvoiceBulkResult(
+                index=index,
+                invoice_number=numbers.get(index, invoice.invoice_number),
+                id=ids.get(index),
+                error=errors.get(index),
+            )
+            for index, invoice in enumerate(invoices)
+        ],
+    )
+
+
+@router.post("/status", response_model=InvoiceStatusUpdateResponse)
+def update_invoice_statuses(
+    payload: InvoiceStatusUpdate,
+    db: Session = Depends(get_db),
+    current_user: UserContext = Depends(get_current_user),
+):
+    """
+    Move a batch of invoices to a new status.
+
+    The invoices are given by id or selected by a filter. Only those whose
+    current status allows the transition are changed, with one UPDATE ...
+    RETURNING over a locked selection of them; the previous statuses it
+    returns adjust the revenue rollups and the stock. Requested ids that were
+    not changed are reported with the reason.
+    """
+    target = payload.status
+    sources = [
+        status
+        for status, targets in INVOICE_STATUS_TRANSITIONS.items()
+        if target in targets
+    ]
+    conditions = [Invoice.organization_id == current_user.organization_id]
+    if payload.ids is not None:
+        conditions.append(Invoice.id.in_(payload.ids))
+    else:
+        if payload.filter.status is not None:
+            conditions.append(Invoice.status == payload.filter.status)
+        if payload.filter.due_before is not None:
+            conditions.append(Invoice.due_date < payload.filter.due_before)
+        if payload.filter.customer_id is not None:
+            conditions.append(Invoice.client_id == payload.filter.customer_id)
+
+    rows = _transition_invoices(db, [*conditions, Invoice.status.in_(sources)], target)
+    organization_id = current_user.organization_id
+    if holds_stock(target):
+        reserve_stock(
+            db, organization_id, [row.id for row in rows if not holds_stock(row.status)]
+        )
+    else:
+        release_stock(
+            db, organization_id, [row.id for row in rows if holds_stock(row.status)]
         )
-        db.add(db_item)
+    deltas = RevenueDeltas()
+    for row in rows:
+        before = row._asdict()
+        deltas.subtract(before)
+        deltas.add({**before, "status": target})
+    deltas.apply(db)
+
+    updated = sorted(row.id for row in rows)
+    skipped = []
+    if payload.ids is not None:
+        unchanged = set(payload.ids) - set(updated)
+        statuses = dict(
+            db.execute(
+                select(Invoice.id, Invoice.status).where(
+                    Invoice.organization_id == current_user.organization_id,
+                    Invoice.id.in_(unchanged),
+                )
+            ).all()
+            if unchanged
+            else []
+        )
+        for invoice_id in sorted(unchanged):
+            status = statuses.get(invoice_id)
+            if status is None:
+                error = "Invoice not found"
+            else:
+                error = f"Cannot change status from {status.value} to {target.value}"
+            skipped.append(InvoiceStatusSkip(id=invoice_id, error=error))
 
     db.commit()
-    db.refresh(db_invoice)
-    return db_invoice
+    if rows:
+        aging_reports.invalidate(current_user.organization_id)
+    return InvoiceStatusUpdateResponse(status=target, updated=updated, skipped=skipped)
 
 
 @router.patch("/{invoice_id}", response_model=InvoiceResponse)
@@ -96,57 +377,66 @@ def update_invoice(
     invoice_id: int,
     invoice: InvoiceUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
-    """Update an invoice"""
+    """
+    Update an invoice.
+
+    ``items``, when given, is the invoice's complete item list. It is applied
+    as a diff against the stored items, and the totals are adjusted by the
+    subtotals of the rows that changed.
+    """
+    # Lock the invoice so concurrent edits apply their incremental totals and
+    # rollup deltas on top of each other
     db_invoice = (
         db.query(Invoice)
         .filter(
             Invoice.id == invoice_id,
             Invoice.organization_id == current_user.organization_id,
         )
+        .with_for_update()
         .first()
     )
     if not db_invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
+    before = revenue_values(db_invoice)
 
     # Update invoice fields
     update_data = invoice.dict(exclude_unset=True)
+    update_data.pop("items", None)
+    if update_data.get("invoice_number", db_invoice.invoice_number) != (
+        db_invoice.invoice_number
+    ):
+        _check_invoice_number(update_data["invoice_number"])
 
-    # If items are being updated, recalculate totals
-    if "items" in update_data:
-        # Delete existing items
-        db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice_id).delete()
-
-        # Add new items
-        subtotal = 0
-        for item in invoice.items:
-            db_item = InvoiceItem(
-                invoice_id=invoice_id,
-                product_id=item.product_id,
-                quantity=item.quantity,
-                unit_price=item.unit_price,
-                subtotal=item.quantity * item.unit_price,
-            )
-            subtotal += db_item.subtotal
-            db.add(db_item)
-
-        # Update invoice totals
-        tax_rate = (
-            invoice.tax_rate if invoice.tax_rate is not None else db_invoice.tax_rate
-        )
-        tax_amount = subtotal * tax_rate
-        total = subtotal + tax_amount
-
-        update_data.update(
-            {"subtotal": subtotal, "tax_amount": tax_amount, "total": total}
-        )
-
+    # Put the items back in stock and reserve them again once the change is
+    # applied, when the invoice's items or whether it holds stock change
+    held = holds_stock(db_invoice.status)
+    holds = holds_stock(update_data.get("status", db_invoice.status))
+    restock = held != holds or (held and invoice.items is not None)
+    if restock and held:
+        release_stock(db, current_user.organization_id, [invoice_id])
     for field, value in update_data.items():
-        if field != "items":  # Skip items as they're handled separately
-            setattr(db_invoice, field, value)
+        setattr(db_invoice, field, value)
 
-    db.commit()
+    # Recalculate totals when the items or the tax rate change
+    if invoice.items is not None or "tax_rate" in update_data:
+        subtotal = db_invoice.subtotal
+        if invoice.items is not None:
+            subtotal += _sync_invoice_items(db, invoice_id, invoice.items)
+        db_invoice.subtotal = subtotal
+        db_invoice.tax_amount = subtotal * (db_invoice.tax_rate or 0)
+        db_invoice.total = subtotal + db_invoice.tax_amount
+
+    if restock and holds:
+        reserve_stock(db, current_user.organization_id, [invoice_id])
+    record_revenue_change(db, before, revenue_values(db_invoice))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=INVOICE_CONFLICT)
+    aging_reports.invalidate(current_user.organization_id)
     db.refresh(db_invoice)
     return db_invoice
 
@@ -155,7 +445,7 @@ def update_invoice(
 def delete_invoice(
     invoice_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Delete an invoice"""
     db_invoice = (
@@ -164,10 +454,14 @@ def delete_invoice(
             Invoice.id == invoice_id,
             Invoice.organization_id == current_user.organization_id,
         )
+        .with_for_update()
         .first()
     )
     if not db_invoice:
         raise HTTPException(status_code=404, detail="Invoice not found")
+    record_revenue_change(db, before=revenue_values(db_invoice))
+    if holds_stock(db_invoice.status):
+        release_stock(db, current_user.organization_id, [invoice_id])
 
     # Delete invoice items first (due to foreign key constraint)
     db.query(InvoiceItem).filter(InvoiceItem.invoice_id == invoice_id).delete()
@@ -175,4 +469,249 @@ def delete_invoice(
     # Delete invoice
     db.delete(db_invoice)
     db.commit()
+    aging_reports.invalidate(current_user.organization_id)
     return {"message": "Invoice deleted successfully"}
+
+
+def _invoice_values(
+    invoice: InvoiceCreate, organization_id: int, invoice_number: str
+) -> dict:
+    """Column values for a new invoice, with totals computed from its items."""
+    subtotal = sum(item.quantity * item.unit_price for item in invoice.items)
+    tax_amount = subtotal * invoice.tax_rate if invoice.tax_rate else 0
+    return {
+        "invoice_number": invoice_number,
+        "status": invoice.status,
+        "issue_date": invoice.issue_date,
+        "due_date": invoice.due_date,
+        "subtotal": subtotal,
+        "tax_rate": invoice.tax_rate,
+        "tax_amount": tax_amount,
+        "total": subtotal + tax_amount,
+        "notes": invoice.notes,
+        "client_id": invoice.customer_id,
+        "organization_id": organization_id,
+    }
+
+
+def _item_values(invoice_id: int, items) -> list[dict]:
+    """Column values for an invoice's new items."""
+    return [
+        {
+            "invoice_id": invoice_id,
+            "product_id": item.product_id,
+            "quantity": item.quantity,
+            "unit_price": item.unit_price,
+            "subtotal": item.quantity * item.unit_price,
+        }
+        for item in items
+    ]
+
+
+def _check_invoice_number(invoice_number: str | None) -> None:
+    if invoice_numbers.is_generated(invoice_number):
+        raise HTTPException(status_code=422, detail=GENERATED_NUMBER_ERROR)
+
+
+def _validate_invoice_batch(
+    db: Session, invoices: List[InvoiceCreate], organization_id: int
+) -> dict[int, str]:
+    """
+    Check a batch of invoices against the database and against each other.
+
+    Pending and paid invoices are checked against the stock left by the
+    invoices before them in the batch. The stock read here only lets the
+    batch report which invoices do not fit; the reservation itself is
+    checked again when it is written.
+
+    Args:
+        db: Database session
+        invoices: The invoices to create
+        organization_id: The organization the invoices are created for
+
+    Returns:
+        An error message for every invalid invoice, keyed by its batch index
+    """
+    numbers = {invoice.invoice_number for invoice in invoices} - {None}
+    customer_ids = {invoice.customer_id for invoice in invoices}
+    product_ids = {item.product_id for invoice in invoices for item in invoice.items}
+
+    taken = set(
+        db.scalars(
+            select(Invoice.invoice_number).where(
+                Invoice.organization_id == organization_id,
+                Invoice.invoice_number.in_(numbers),
+            )
+        )
+    )
+    customers = set(
+        db.scalars(
+            select(Client.id).where(
+                Client.organization_id == organization_id,
+                Client.id.in_(customer_ids),
+            )
+        )
+    )
+    stock = dict(
+        db.execute(
+            select(Product.id, func.coalesce(Product.quantity_in_stock, 0)).where(
+                Product.organization_id == organization_id,
+                Product.id.in_(product_ids),
+            )
+        ).all()
+    )
+
+    errors = {}
+    for index, invoice in enumerate(invoices):
+        missing = sorted(
+            {item.product_id for item in invoice.items if item.product_id not in stock}
+        )
+        needed = defaultdict(int)
+        if holds_stock(invoice.status):
+            for item in invoice.items:
+                needed[item.product_id] += item.quantity
+        short = sorted(
+            product_id
+            for product_id, quantity in needed.items()
+            if quantity > stock.get(product_id, 0)
+        )
+        if invoice_numbers.is_generated(invoice.invoice_number):
+            errors[index] = GENERATED_NUMBER_ERROR
+        elif invoice.invoice_number in taken:
+            errors[index] = "Invoice number already exists"
+        elif invoice.customer_id not in customers:
+            errors[index] = "Customer not found"
+        elif missing:
+            errors[index] = f"Products not found: {', '.join(map(str, missing))}"
+        elif short:
+            errors[index] = (
+                f"Insufficient stock for products: {', '.join(map(str, short))}"
+            )
+        else:
+            if invoice.invoice_number is not None:
+                taken.add(invoice.invoice_number)
+            for product_id, quantity in needed.items():
+                stock[product_id] -= quantity
+    return errors
+
+
+def _transition_invoices(db: Session, conditions: list, status: InvoiceStatus):
+    """
+    Set the status of the invoices matching ``conditions``.
+
+    Returns:
+        The changed invoices' ids and ``REVENUE_FIELDS``, with their previous
+        status
+    """
+    fields = [Invoice.__table__.c[field] for field in REVENUE_FIELDS]
+    if db.get_bind().dialect.name != "postgresql":
+        # SQLite cannot return columns of the UPDATE's FROM clause, and has no
+        # row locks to take: read the previous statuses before updating
+        rows = db.execute(select(Invoice.id, *fields).where(*conditions)).all()
+        db.execute(
+            update(Invoice)
+            .where(Invoice.id.in_([row.id for row in rows]))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        return rows
+
+    current = (
+        select(Invoice.id, Invoice.status)
+        .where(*conditions)
+        .with_for_update()
+        .subquery()
+    )
+    return db.execute(
+        update(Invoice)
+        .where(Invoice.id == current.c.id)
+        .values(status=status)
+        .returning(
+            Invoice.id,
+            *[column for column in fields if column.name != "status"],
+            current.c.status,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def _sync_invoice_items(
+    db: Session, invoice_id: int, items: List[InvoiceItemUpdate]
+) -> float:
+    """
+    Bring an invoice's stored items in line with the requested list.
+
+    Entries with an ``id`` update that item, keeping its current values for
+    omitted fields. Entries without one reuse a remaining item of the same
+    product, or are inserted. Stored items left unmatched are deleted. Only
+    rows whose values change are written.
+
+    Args:
+        db: Database session
+        invoice_id: The invoice's ID
+        items: The invoice's complete item list
+
+    Returns:
+        The change in the invoice's subtotal
+
+    Raises:
+        HTTPException: If an item ID doesn't belong to the invoice or a new
+            item is missing a field
+    """
+    pending = {
+        item.id: item
+        for item in db.scalars(
+            select(InvoiceItem)
+            .where(InvoiceItem.invoice_id == invoice_id)
+            .order_by(InvoiceItem.id)
+        )
+    }
+
+    # Explicit ids claim their items first, the rest are matched by product
+    matched = {}
+    for index, entry in enumerate(items):
+        if entry.id is not None:
+            if entry.id not in pending:
+                raise HTTPException(
+                    status_code=404, detail=f"Invoice item {entry.id} not found"
+                )
+            matched[index] = pending.pop(entry.id)
+    by_product = {}
+    for item in pending.values():
+        by_product.setdefault(item.product_id, []).append(item)
+
+    delta = 0.0
+    new_items, changed = [], []
+    for index, entry in enumerate(items):
+        item = matched.get(index)
+        if item is None and by_product.get(entry.product_id):
+            item = by_product[entry.product_id].pop(0)
+            del pending[item.id]
+
+        if item is None:
+            if None in (entry.product_id, entry.quantity, entry.unit_price):
+                raise HTTPException(
+                    status_code=422,
+                    detail="New invoice items need product_id, quantity and unit_price",
+                )
+            new_items.append(entry)
+            delta += entry.quantity * entry.unit_price
+            continue
+
+        values = {
+            field: getattr(item, field) if value is None else value
+            for field, value in entry.dict(exclude={"id"}).items()
+        }
+        if any(getattr(item, field) != value for field, value in values.items()):
+            values["subtotal"] = values["quantity"] * values["unit_price"]
+            changed.append({"id": item.id, **values})
+            delta += values["subtotal"] - item.subtotal
+
+    if pending:
+        delta -= sum(item.subtotal for item in pending.values())
+        db.execute(delete(InvoiceItem).where(InvoiceItem.id.in_(list(pending))))
+    if changed:
+        db.execute(update(InvoiceItem), changed)
+    if new_items:
+        db.execute(insert(InvoiceItem), _item_values(invoice_id, new_items))
+    return delta
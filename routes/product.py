@@ -1,41 +1,77 @@
-from typing import List
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile
 from sqlalchemy.orm import Session
 
 from models.product import Product
-from models.user import User
 from schemas.request import ProductCreate, ProductUpdate
-from schemas.response import ProductResponse
-from utils import get_current_user
+from schemas.response import ProductImportResponse, ProductResponse
+from utils import UserContext, get_current_user
 from utils.auth import get_db
+from utils.pagination import paginate
+from utils.imports import parse_import_rows
+from utils.product_import import import_products
+from utils.low_stock import LOW_STOCK, is_low_on_stock
+from utils.replicas import get_read_db
+from utils.search import search_products
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
 
 @router.get("", response_model=List[ProductResponse])
 def get_products(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: UserContext = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: str | None = None,
 ):
     """Get all products for the current user's organization"""
-    products = (
-        db.query(Product)
-        .filter(Product.organization_id == current_user.organization_id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = db.query(Product).filter(
+        Product.organization_id == current_user.organization_id
     )
-    return products
+    return paginate(query, Product.id, response, cursor, skip, limit)
+
+
+@router.get("/low-stock", response_model=List[ProductResponse])
+def get_low_stock_products(
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: UserContext = Depends(get_current_user),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+):
+    """
+    Get the organization's products at or below their reorder level.
+
+    Answered from the partial ``ix_products_low_stock`` index, which only
+    holds those products.
+    """
+    query = db.query(Product).filter(
+        Product.organization_id == current_user.organization_id,
+        LOW_STOCK,
+    )
+    return paginate(query, Product.id, response, cursor, skip, limit)
+
+
+@router.get("/search", response_model=List[ProductResponse])
+def search_product_catalog(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: UserContext = Depends(get_current_user),
+):
+    """Search the organization's products by name, SKU or description"""
+    return search_products(db, current_user.organization_id, q, limit)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
 def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Get a specific product by ID"""
     product = (
@@ -55,7 +91,7 @@ def get_product(
 def create_product(
     product: ProductCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Create a new product"""
     db_product = Product(**product.dict(), organization_id=current_user.organization_id)
@@ -65,12 +101,31 @@ def create_product(
     return db_product
 
 
+@router.post("/import", response_model=ProductImportResponse)
+def import_product_file(
+    file: UploadFile,
+    format: Literal["csv", "ndjson"] = "csv",
+    db: Session = Depends(get_db),
+    current_user: UserContext = Depends(get_current_user),
+):
+    """
+    Create or update products from a CSV or NDJSON file, matched by SKU.
+
+    The upload is parsed and upserted in chunks, each committed on its own,
+    so memory use does not grow with the file. Rows that fail validation are
+    skipped and reported with their line number.
+    """
+    return import_products(
+        db, current_user.organization_id, parse_import_rows(file.file, format)
+    )
+
+
 @router.patch("/{product_id}", response_model=ProductResponse)
 def update_product(
     product_id: int,
     product: ProductUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Update a product"""
     db_product = (
@@ -86,6 +141,8 @@ def update_product(
 
     for field, value in product.dict(exclude_unset=True).items():
         setattr(db_product, field, value)
+    if not is_low_on_stock(db_product):
+        db_product.low_stock_notified = False
 
     db.commit()
     db.refresh(db_product)
@@ -96,7 +153,7 @@ def update_product(
 def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserContext = Depends(get_current_user),
 ):
     """Delete a product"""
     db_product = (
@@ -0,0 +1,94 @@
+from datetime import date
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from models.enums import InvoiceStatus
+from models.report import RevenueRollup
+from schemas.response import AgingReport, RevenueReportRow
+from utils import UserContext, get_current_user
+from utils.aging import aging_reports
+from utils.auth import get_db
+from utils.replicas import get_read_db
+from utils.rollups import month_start
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+REVENUE_DIMENSIONS = {
+    "month": RevenueRollup.month,
+    "customer": RevenueRollup.client_id.label("customer_id"),
+    "status": RevenueRollup.status,
+}
+
+
+@router.get("/revenue", response_model=List[RevenueReportRow])
+def get_revenue(
+    db: Session = Depends(get_read_db),
+    current_user: UserContext = Depends(get_current_user),
+    group_by: List[Literal["month", "customer", "status"]] = Query(["month"]),
+    from_month: date | None = None,
+    to_month: date | None = None,
+    customer_id: int | None = None,
+    status: InvoiceStatus | None = None,
+):
+    """
+    Get invoice revenue for the current user's organization, by issue month,
+    customer and/or status.
+
+    Answered from the revenue rollups rather than the invoices table.
+    ``from_month`` and ``to_month`` are inclusive; any day of the month works.
+    """
+    dimensions = [REVENUE_DIMENSIONS[name] for name in dict.fromkeys(group_by)]
+    invoice_count = func.sum(RevenueRollup.invoice_count)
+    query = (
+        select(
+            *dimensions,
+            invoice_count.label("invoice_count"),
+            func.sum(RevenueRollup.subtotal).label("subtotal"),
+            func.sum(RevenueRollup.tax_amount).label("tax_amount"),
+            func.sum(RevenueRollup.total).label("total"),
+        )
+        .where(RevenueRollup.organization_id == current_user.organization_id)
+        .group_by(*dimensions)
+        .having(invoice_count > 0)
+        .order_by(*dimensions)
+    )
+    if from_month is not None:
+        query = query.where(RevenueRollup.month >= month_start(from_month))
+    if to_month is not None:
+        query = query.where(RevenueRollup.month <= month_start(to_month))
+    if customer_id is not None:
+        query = query.where(RevenueRollup.client_id == customer_id)
+    if status is not None:
+        query = query.where(RevenueRollup.status == status)
+
+    return [RevenueReportRow(**row) for row in db.execute(query).mappings()]
+
+
+@router.get("/aging", response_model=AgingReport)
+def get_aging(
+    db: Session = Depends(get_db),
+    current_user: UserContext = Depends(get_current_user),
+    customer_id: int | None = None,
+):
+    """
+    Get the current user's organization's pending invoices bucketed by days
+    overdue, in total and per customer.
+
+    Served from a snapshot that is refreshed periodically and whenever an
+    invoice changes, so it is cheap to poll. ``as_of`` tells its age.
+    ``customer_id`` only narrows the per-customer breakdown.
+    """
+    report = aging_reports.get(db, current_user.organization_id)
+    if customer_id is not None:
+        report = {
+            **report,
+            "clients": [
+                client
+                for client in report["clients"]
+                if client["customer_id"] == customer_id
+            ],
+        }
+    return report
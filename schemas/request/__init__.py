@@ -1,5 +1,12 @@
-from .client import ClientCreate, ClientUpdate
-from .invoice import InvoiceCreate, InvoiceUpdate, InvoiceItemUpdate
+from .client import ClientCreate, ClientBulkImport, ClientUpdate
+from .invoice import (
+    InvoiceCreate,
+    InvoiceBulkCreate,
+    InvoiceUpdate,
+    InvoiceItemUpdate,
+    InvoiceStatusFilter,
+    InvoiceStatusUpdate,
+)
 from .product import ProductCreate, ProductUpdate
 from .user import (
     UserCreate,
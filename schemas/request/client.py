@@ -1,11 +1,15 @@
+from typing import Any, Dict, List
+
 from pydantic import BaseModel, Field, EmailStr
 
 
+# Lengths match the columns of models.client.Client, so values that do not
+# fit are rejected here rather than by the database
 class ClientBase(BaseModel):
-    name: str = Field(..., min_length=1, max_length=255)
-    email: EmailStr | None = None
+    name: str = Field(..., min_length=1, max_length=127)
+    email: EmailStr | None = Field(None, max_length=127)
     phone: str | None = Field(None, max_length=20)
-    address: str | None = Field(None, max_length=500)
+    address: str | None = Field(None, max_length=255)
     tax_number: str | None = Field(None, max_length=50)
 
 
@@ -13,10 +17,15 @@ class ClientCreate(ClientBase):
     pass
 
 
+class ClientBulkImport(BaseModel):
+    # Validated one by one, so invalid clients are rejected individually
+    clients: List[Dict[str, Any]] = Field(..., min_length=1, max_length=50000)
+
+
 class ClientUpdate(BaseModel):
-    name: str | None = Field(None, min_length=1, max_length=255)
-    email: EmailStr | None = None
+    name: str | None = Field(None, min_length=1, max_length=127)
+    email: EmailStr | None = Field(None, max_length=127)
     phone: str | None = Field(None, max_length=20)
-    address: str | None = Field(None, max_length=500)
+    address: str | None = Field(None, max_length=255)
     tax_number: str | None = Field(None, max_length=50)
     is_active: bool | None = None
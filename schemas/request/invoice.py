@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from models.invoice import InvoiceStatus
 
 
@@ -11,7 +11,8 @@ class InvoiceItemBase(BaseModel):
 
 
 class InvoiceBase(BaseModel):
-    invoice_number: str = Field(..., min_length=1, max_length=50)
+    # Generated from the organization's counter when omitted
+    invoice_number: str | None = Field(None, min_length=1, max_length=50)
     status: InvoiceStatus = InvoiceStatus.DRAFT
     issue_date: datetime
     due_date: datetime
@@ -24,7 +25,12 @@ class InvoiceCreate(InvoiceBase):
     items: List[InvoiceItemBase]
 
 
+class InvoiceBulkCreate(BaseModel):
+    invoices: List[InvoiceCreate] = Field(..., min_length=1, max_length=1000)
+
+
 class InvoiceItemUpdate(InvoiceItemBase):
+    id: int | None = None
     product_id: int | None = None
     quantity: int | None = Field(None, gt=0)
     unit_price: float | None = Field(None, gt=0)
@@ -38,4 +44,23 @@ class InvoiceUpdate(BaseModel):
     tax_rate: float | None = Field(None, ge=0, le=1)
     notes: str | None = Field(None, max_length=1000)
     customer_id: int | None = None
-    items: List[InvoiceItemBase] | None = None
+    items: List[InvoiceItemUpdate] | None = None
+
+
+class InvoiceStatusFilter(BaseModel):
+    status: InvoiceStatus | None = None
+    due_before: datetime | None = None
+    customer_id: int | None = None
+
+
+class InvoiceStatusUpdate(BaseModel):
+    status: InvoiceStatus
+    # Either explicit invoice ids or a filter over the organization's invoices
+    ids: List[int] | None = Field(None, min_length=1, max_length=1000)
+    filter: InvoiceStatusFilter | None = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide exactly one of ids or filter")
+        return self
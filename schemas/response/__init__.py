@@ -1,4 +1,12 @@
-from .client import ClientResponse
-from .invoice import InvoiceResponse, InvoiceItemResponse
-from .product import ProductResponse
+from .client import ClientResponse, ClientImportError, ClientImportResponse
+from .invoice import (
+    InvoiceResponse,
+    InvoiceItemResponse,
+    InvoiceBulkResult,
+    InvoiceBulkResponse,
+    InvoiceStatusSkip,
+    InvoiceStatusUpdateResponse,
+)
+from .product import ProductResponse, ProductImportError, ProductImportResponse
 from .user import UserAuthResponse, TokenResponse, UserResponse, OrganizationResponse
+from .report import RevenueReportRow, AgingBucket, ClientAging, AgingReport
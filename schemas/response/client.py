@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List
 from pydantic import BaseModel, EmailStr
 
 
@@ -16,3 +17,17 @@ class ClientResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ClientImportError(BaseModel):
+    line: int
+    error: str
+
+
+class ClientImportResponse(BaseModel):
+    processed: int
+    created: int
+    updated: int
+    rejected: int
+    # Only the first errors are listed; ``rejected`` counts all of them
+    errors: List[ClientImportError]
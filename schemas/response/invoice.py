@@ -36,3 +36,27 @@ class InvoiceResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class InvoiceBulkResult(BaseModel):
+    index: int
+    invoice_number: str | None
+    id: int | None = None
+    error: str | None = None
+
+
+class InvoiceBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[InvoiceBulkResult]
+
+
+class InvoiceStatusSkip(BaseModel):
+    id: int
+    error: str
+
+
+class InvoiceStatusUpdateResponse(BaseModel):
+    status: InvoiceStatus
+    updated: List[int]
+    skipped: List[InvoiceStatusSkip]
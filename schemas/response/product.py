@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List
 from pydantic import BaseModel
 
 
@@ -17,3 +18,16 @@ class ProductResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ProductImportError(BaseModel):
+    line: int
+    error: str
+
+
+class ProductImportResponse(BaseModel):
+    processed: int
+    imported: int
+    failed: int
+    # Only the first errors are listed; ``failed`` counts all of them
+    errors: List[ProductImportError]
@@ -0,0 +1,30 @@
+from datetime import date, datetime
+from typing import List
+from pydantic import BaseModel
+from models.enums import InvoiceStatus
+
+
+class RevenueReportRow(BaseModel):
+    month: date | None = None
+    customer_id: int | None = None
+    status: InvoiceStatus | None = None
+    invoice_count: int
+    subtotal: float
+    tax_amount: float
+    total: float
+
+
+class AgingBucket(BaseModel):
+    invoice_count: int
+    amount: float
+
+
+class ClientAging(BaseModel):
+    customer_id: int
+    buckets: dict[str, AgingBucket]
+
+
+class AgingReport(BaseModel):
+    as_of: datetime
+    buckets: dict[str, AgingBucket]
+    clients: List[ClientAging]
@@ -0,0 +1,147 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+# The app reads its configuration on import, so point it at a throwaway
+# SQLite database before anything imports config
+_database_dir = tempfile.mkdtemp(prefix="invoicing-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_dir}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret-key-" + "x" * 32)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import config
+import models  # noqa: F401 - registers every model on Base.metadata
+from main import app
+from models.user import Organization, User
+from utils.auth_cache import auth_cache
+from utils.numbering import invoice_numbers
+from utils.revocation import revocation_list
+
+
+@pytest.fixture(autouse=True)
+def database():
+    config.Base.metadata.create_all(config.engine)
+    # Rebuilt from the empty database, as user IDs repeat across tests
+    revocation_list.start()
+    yield
+    auth_cache.clear()
+    # Reserved blocks refer to counter rows that are about to be dropped
+    invoice_numbers._blocks.clear()
+    config.Base.metadata.drop_all(config.engine)
+
+
+@pytest.fixture
+def db():
+    session = config.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    # Not entered as a context manager, so the lifespan's background jobs
+    # do not run during the tests
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_user(client, db):
+    """Register a verified admin in a new organization; returns auth headers."""
+
+    def make(email="admin@example.com"):
+        organization = Organization(name="Acme", email=f"org-{email}")
+        db.add(organization)
+        db.commit()
+        response = client.post(
+            "/auth/register",
+            json={
+                "email": email,
+                "password": "password",
+                "first_name": "Ada",
+                "last_name": "Lovelace",
+            },
+        )
+        assert response.status_code == 201, response.text
+        user = db.query(User).filter(User.email == email).one()
+        user.organization_id = organization.id
+        user.is_email_verified = True
+        user.is_admin = True
+        db.commit()
+        token = response.json()["token"]["access"]
+        return {"Authorization": f"Bearer {token}"}
+
+    return make
+
+
+@pytest.fixture
+def headers(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def count_queries():
+    """Count the statements sent to the database inside the ``with`` block."""
+
+    @contextmanager
+    def count():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(config.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(config.engine, "before_cursor_execute", before_cursor_execute)
+
+    return count
+
+
+@pytest.fixture
+def customer(client, headers):
+    response = client.post(
+        "/client",
+        json={"name": "Customer", "email": "customer@example.com"},
+        headers=headers,
+    )
+    return response.json()["id"]
+
+
+@pytest.fixture
+def make_product(client, headers):
+    def make(sku="SKU-1", **fields):
+        response = client.post(
+            "/products",
+            json={"name": f"Product {sku}", "sku": sku, "unit_price": 10, **fields},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+        return response.json()["id"]
+
+    return make
+
+
+@pytest.fixture
+def invoice_payload(customer):
+    """Build an invoice body; ``items`` maps product IDs to quantities."""
+
+    def payload(items=None, status="pending", **fields):
+        return {
+            "status": status,
+            "issue_date": "2025-01-15T00:00:00",
+            "due_date": "2025-02-15T00:00:00",
+            "customer_id": customer,
+            "items": [
+                {"product_id": product_id, "quantity": quantity, "unit_price": 10}
+                for product_id, quantity in (items or {}).items()
+            ],
+            **fields,
+        }
+
+    return payload
@@ -0,0 +1,65 @@
+from models.client import Client
+
+
+def _clients(client, headers):
+    return {
+        row["email"]: (row["name"], row["phone"])
+        for row in client.get("/client", headers=headers).json()
+    }
+
+
+def test_batch_upserts_by_email(client, headers):
+    client.post(
+        "/client",
+        json={"name": "Old", "email": "a@example.com", "phone": "1"},
+        headers=headers,
+    )
+
+    response = client.post(
+        "/client/bulk",
+        json={
+            "clients": [
+                {"name": "New", "email": "a@example.com"},
+                {"name": "B", "email": "b@example.com"},
+                {"name": "B again", "email": "b@example.com", "phone": "2"},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert (result["created"], result["updated"], result["rejected"]) == (1, 1, 0)
+    assert _clients(client, headers) == {
+        "a@example.com": ("New", "1"),
+        "b@example.com": ("B again", "2"),
+    }
+
+
+def test_values_longer_than_the_columns_are_rejected_per_row(client, headers, db):
+    rows = [
+        {"name": "x" * 128, "email": "long-name@example.com"},
+        {"name": "Long address", "email": "a@example.com", "address": "x" * 256},
+        {"name": "Long email", "email": "x" * 120 + "@example.com"},
+        {"name": "Fits", "email": "fits@example.com", "address": "x" * 255},
+    ]
+
+    response = client.post("/client/bulk", json={"clients": rows}, headers=headers)
+
+    result = response.json()
+    assert (result["created"], result["rejected"]) == (1, 3)
+    assert [error["line"] for error in result["errors"]] == [1, 2, 3]
+    assert [client.email for client in db.query(Client)] == ["fits@example.com"]
+
+
+def test_file_import_reports_line_numbers(client, headers):
+    csv = "name,email,phone\nA,a@example.com,\nNo email,,\nB,b@example.com,5\n"
+
+    response = client.post(
+        "/client/import", files={"file": ("clients.csv", csv)}, headers=headers
+    )
+
+    result = response.json()
+    assert (result["processed"], result["created"], result["rejected"]) == (3, 2, 1)
+    assert result["errors"][0]["line"] == 3
+    assert _clients(client, headers)["b@example.com"] == ("B", "5")
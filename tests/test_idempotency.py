@@ -0,0 +1,54 @@
+import pytest
+
+import routes.auth
+import utils.auth
+from models.user import User
+from utils.auth_cache import auth_cache
+
+
+def _create_client(client, headers, key="key-1"):
+    return client.post(
+        "/client",
+        json={"name": "Customer", "email": "customer@example.com"},
+        headers={**headers, "Idempotency-Key": key},
+    )
+
+
+def test_retry_replays_the_stored_response(client, headers):
+    first = _create_client(client, headers)
+    assert first.status_code == 200, first.text
+
+    retry = _create_client(client, headers)
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+
+@pytest.mark.parametrize("mode", ["database", "stateless"])
+def test_revoked_token_is_not_replayed(client, headers, monkeypatch, mode):
+    monkeypatch.setattr(utils.auth, "TOKEN_REVOCATION_MODE", mode)
+    monkeypatch.setattr(routes.auth, "TOKEN_REVOCATION_MODE", mode)
+    assert _create_client(client, headers).status_code == 200
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+
+    retry = _create_client(client, headers)
+    assert retry.status_code == 401
+    assert "Idempotent-Replayed" not in retry.headers
+    assert "customer@example.com" not in retry.text
+
+
+def test_invalid_token_is_rejected_before_the_key_is_claimed(client, headers):
+    response = _create_client(client, {"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+
+    # The key was not claimed for anyone, so the real user can still use it
+    assert _create_client(client, headers).status_code == 200
+
+
+def test_inactive_user_is_not_replayed(client, headers, db):
+    assert _create_client(client, headers).status_code == 200
+    db.query(User).update({"is_active": False})
+    db.commit()
+    auth_cache.clear()
+
+    assert _create_client(client, headers).status_code == 401
@@ -0,0 +1,123 @@
+import pytest
+
+
+@pytest.fixture
+def products(make_product):
+    return [make_product(f"SKU-{i}", quantity_in_stock=100) for i in range(3)]
+
+
+@pytest.fixture
+def invoice(client, headers, products, invoice_payload):
+    response = client.post(
+        "/invoices",
+        json=invoice_payload({products[0]: 1, products[1]: 2}, tax_rate=0.5),
+        headers=headers,
+    )
+    return response.json()
+
+
+def _patch_items(client, headers, invoice, items):
+    return client.patch(
+        f"/invoices/{invoice['id']}", json={"items": items}, headers=headers
+    )
+
+
+def _items(invoice):
+    return sorted(
+        (item["id"], item["product_id"], item["quantity"], item["unit_price"])
+        for item in invoice["items"]
+    )
+
+
+def test_items_given_by_id_keep_omitted_fields(client, headers, invoice):
+    first, second = sorted(invoice["items"], key=lambda item: item["id"])
+
+    response = _patch_items(
+        client,
+        headers,
+        invoice,
+        [{"id": first["id"], "quantity": 4}, {"id": second["id"], "unit_price": 5}],
+    )
+
+    assert response.status_code == 200, response.text
+    assert _items(response.json()) == [
+        (first["id"], first["product_id"], 4, 10),
+        (second["id"], second["product_id"], 2, 5),
+    ]
+
+
+def test_items_without_id_reuse_the_products_rows(client, headers, invoice, products):
+    ids = {item["product_id"]: item["id"] for item in invoice["items"]}
+    items = [
+        {"product_id": products[1], "quantity": 2, "unit_price": 10},
+        {"product_id": products[2], "quantity": 3, "unit_price": 10},
+    ]
+
+    response = _patch_items(client, headers, invoice, items)
+
+    # The first product's row is deleted, the second's kept as it was, and
+    # the third's inserted
+    updated = response.json()
+    assert [item for item in _items(updated) if item[1] == products[1]] == [
+        (ids[products[1]], products[1], 2, 10.0)
+    ]
+    assert {item["product_id"] for item in updated["items"]} == set(products[1:])
+
+
+def test_totals_follow_the_item_changes(client, headers, invoice, products):
+    response = _patch_items(
+        client,
+        headers,
+        invoice,
+        [
+            {"product_id": products[0], "quantity": 3, "unit_price": 10},
+            {"product_id": products[2], "quantity": 1, "unit_price": 7},
+        ],
+    )
+
+    updated = response.json()
+    assert updated["subtotal"] == pytest.approx(37)
+    assert updated["tax_amount"] == pytest.approx(18.5)
+    assert updated["total"] == pytest.approx(55.5)
+    assert sum(item["subtotal"] for item in updated["items"]) == pytest.approx(37)
+
+
+def test_unchanged_items_are_not_written(client, headers, invoice, count_queries):
+    items = [
+        {"id": item["id"], "quantity": item["quantity"]} for item in invoice["items"]
+    ]
+
+    with count_queries() as statements:
+        response = _patch_items(client, headers, invoice, items)
+
+    assert response.status_code == 200, response.text
+    item_writes = (
+        "INSERT INTO invoice_items",
+        "UPDATE invoice_items",
+        "DELETE FROM invoice_items",
+    )
+    assert not [sql for sql in statements if sql.lstrip().startswith(item_writes)]
+
+
+def test_item_of_another_invoice_is_not_found(
+    client, headers, invoice, products, invoice_payload
+):
+    other = client.post(
+        "/invoices", json=invoice_payload({products[2]: 1}), headers=headers
+    ).json()
+
+    response = _patch_items(
+        client, headers, invoice, [{"id": other["items"][0]["id"], "quantity": 1}]
+    )
+
+    assert response.status_code == 404
+
+
+def test_new_items_need_every_field(client, headers, invoice, products):
+    response = _patch_items(
+        client, headers, invoice, [{"product_id": products[2], "quantity": 1}]
+    )
+
+    assert response.status_code == 422
+    current = client.get(f"/invoices/{invoice['id']}", headers=headers).json()
+    assert _items(current) == _items(invoice)
@@ -0,0 +1,84 @@
+from datetime import datetime
+
+from models.client import Client
+from models.invoice import Invoice
+
+
+def _invoice(customer_id, **fields):
+    return {
+        "status": "draft",
+        "issue_date": "2025-01-01T00:00:00",
+        "due_date": "2025-02-01T00:00:00",
+        "customer_id": customer_id,
+        "items": [],
+        **fields,
+    }
+
+
+def _customer(client, headers):
+    return client.post(
+        "/client",
+        json={"name": "Customer", "email": "customer@example.com"},
+        headers=headers,
+    ).json()["id"]
+
+
+def test_numbers_start_after_the_organizations_existing_ones(client, headers, db):
+    customer_id = _customer(client, headers)
+    organization_id = db.get(Client, customer_id).organization_id
+    # Numbered before the counters existed
+    db.add(
+        Invoice(
+            invoice_number="INV-000004",
+            organization_id=organization_id,
+            client_id=customer_id,
+            issue_date=datetime(2025, 1, 1),
+            due_date=datetime(2025, 2, 1),
+            subtotal=0,
+            tax_amount=0,
+            total=0,
+        )
+    )
+    db.commit()
+
+    response = client.post("/invoices", json=_invoice(customer_id), headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["invoice_number"] == "INV-000005"
+
+
+def test_client_numbers_in_the_generated_format_are_rejected(client, headers):
+    customer_id = _customer(client, headers)
+    invoice = _invoice(customer_id, invoice_number="INV-000004")
+
+    response = client.post("/invoices", json=invoice, headers=headers)
+    assert response.status_code == 422
+
+    response = client.post(
+        "/invoices/bulk", json={"invoices": [invoice]}, headers=headers
+    )
+    assert response.json()["failed"] == 1
+
+    created = client.post("/invoices", json=_invoice(customer_id), headers=headers)
+    response = client.patch(
+        f"/invoices/{created.json()['id']}",
+        json={"invoice_number": "INV-000009"},
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+
+def test_duplicate_client_number_is_a_conflict(client, headers):
+    customer_id = _customer(client, headers)
+    invoice = _invoice(customer_id, invoice_number="2025-001")
+
+    assert client.post("/invoices", json=invoice, headers=headers).status_code == 200
+    response = client.post("/invoices", json=invoice, headers=headers)
+    assert response.status_code == 409
+
+    other = client.post("/invoices", json=_invoice(customer_id), headers=headers)
+    response = client.patch(
+        f"/invoices/{other.json()['id']}",
+        json={"invoice_number": "2025-001"},
+        headers=headers,
+    )
+    assert response.status_code == 409
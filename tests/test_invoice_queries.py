@@ -0,0 +1,80 @@
+import pytest
+
+
+@pytest.fixture
+def create_invoices(client, headers):
+    customer = client.post(
+        "/client",
+        json={"name": "Customer", "email": "customer@example.com"},
+        headers=headers,
+    ).json()
+    products = [
+        client.post(
+            "/products",
+            json={"name": f"Product {i}", "sku": f"SKU-{i}", "unit_price": 10},
+            headers=headers,
+        ).json()
+        for i in range(10)
+    ]
+
+    def create(count, items=2):
+        invoices = []
+        for _ in range(count):
+            response = client.post(
+                "/invoices",
+                json={
+                    "status": "draft",
+                    "issue_date": "2025-01-01T00:00:00",
+                    "due_date": "2025-02-01T00:00:00",
+                    "customer_id": customer["id"],
+                    "items": [
+                        {"product_id": product["id"], "quantity": 1, "unit_price": 10}
+                        for product in products[:items]
+                    ],
+                },
+                headers=headers,
+            )
+            assert response.status_code == 200, response.text
+            invoices.append(response.json())
+        return invoices
+
+    return create
+
+
+def _count_get(client, headers, count_queries, url):
+    # Warm the auth cache first, so only the endpoint's own queries count
+    client.get(url, headers=headers)
+    with count_queries() as statements:
+        response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json(), len(statements)
+
+
+def test_invoice_list_loads_items_in_constant_queries(
+    client, headers, count_queries, create_invoices
+):
+    create_invoices(2)
+    invoices, few = _count_get(client, headers, count_queries, "/invoices")
+    assert len(invoices) == 2
+
+    create_invoices(23)
+    invoices, many = _count_get(client, headers, count_queries, "/invoices")
+    assert len(invoices) == 25
+    assert all(len(invoice["items"]) == 2 for invoice in invoices)
+    assert many == few
+    assert many <= 3
+
+
+def test_invoice_detail_loads_items_in_constant_queries(
+    client, headers, count_queries, create_invoices
+):
+    small, large = create_invoices(1, items=1) + create_invoices(1, items=10)
+    detail, few = _count_get(client, headers, count_queries, f"/invoices/{small['id']}")
+    assert len(detail["items"]) == 1
+
+    detail, many = _count_get(
+        client, headers, count_queries, f"/invoices/{large['id']}"
+    )
+    assert len(detail["items"]) == 10
+    assert many == few
+    assert many <= 2
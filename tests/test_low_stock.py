@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import select
+
+from models.product import Product
+from utils.low_stock import LOW_STOCK, is_low_on_stock
+
+
+@pytest.mark.parametrize(
+    "quantity_in_stock, reorder_level",
+    [(None, 5), (5, None), (None, None), (0, 5), (5, 5), (6, 5)],
+)
+def test_low_stock_check_matches_the_index_predicate(
+    db, make_product, quantity_in_stock, reorder_level
+):
+    product = db.get(Product, make_product())
+    product.quantity_in_stock = quantity_in_stock
+    product.reorder_level = reorder_level
+    db.commit()
+
+    listed = db.scalar(select(Product.id).where(Product.id == product.id, LOW_STOCK))
+    assert is_low_on_stock(product) == (listed is not None)
+
+
+def test_product_without_stock_is_not_listed_as_low(client, headers, db, make_product):
+    product = make_product(reorder_level=5)
+    db.get(Product, product).quantity_in_stock = None
+    db.commit()
+
+    response = client.get("/products/low-stock", headers=headers)
+    assert response.status_code == 200, response.text
+    assert product not in [listed["id"] for listed in response.json()]
+    assert not is_low_on_stock(db.get(Product, product))
+
+
+def test_stock_moves_clear_the_notification_without_a_reorder_level(
+    client, headers, db, make_product, invoice_payload
+):
+    product = make_product(quantity_in_stock=10)
+    db_product = db.get(Product, product)
+    db_product.reorder_level = None
+    db_product.low_stock_notified = True
+    db.commit()
+
+    # Leaves no stock, which would be low against a reorder level of 0
+    response = client.post(
+        "/invoices", json=invoice_payload({product: 10}), headers=headers
+    )
+    assert response.status_code == 200, response.text
+
+    db.expire_all()
+    assert db.get(Product, product).quantity_in_stock == 0
+    assert db.get(Product, product).low_stock_notified is False
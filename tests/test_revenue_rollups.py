@@ -0,0 +1,123 @@
+from collections import defaultdict
+
+import pytest
+
+from utils.rollups import rebuild_revenue_rollups
+
+GROUP_BY = {"group_by": ["month", "customer", "status"]}
+
+
+def _report(client, headers):
+    rows = client.get("/reports/revenue", params=GROUP_BY, headers=headers).json()
+    return {
+        (row["month"], row["customer_id"], row["status"]): (
+            row["invoice_count"],
+            pytest.approx(row["subtotal"]),
+            pytest.approx(row["tax_amount"]),
+            pytest.approx(row["total"]),
+        )
+        for row in rows
+    }
+
+
+def _expected(client, headers):
+    """The report computed straight from the invoices."""
+    totals = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    for invoice in client.get("/invoices", headers=headers).json():
+        key = (
+            invoice["issue_date"][:7] + "-01",
+            invoice["customer_id"],
+            invoice["status"],
+        )
+        row = totals[key]
+        row[0] += 1
+        row[1] += invoice["subtotal"]
+        row[2] += invoice["tax_amount"]
+        row[3] += invoice["total"]
+    return {key: tuple(row) for key, row in totals.items()}
+
+
+def test_rollups_follow_every_invoice_write(
+    client, headers, make_product, invoice_payload
+):
+    product = make_product(quantity_in_stock=1000)
+    other_customer = client.post(
+        "/client", json={"name": "Other", "email": "other@example.com"}, headers=headers
+    ).json()["id"]
+
+    january = client.post(
+        "/invoices", json=invoice_payload({product: 2}, tax_rate=0.2), headers=headers
+    ).json()
+    february = client.post(
+        "/invoices",
+        json=invoice_payload(
+            {product: 3}, issue_date="2025-02-03T00:00:00", status="draft"
+        ),
+        headers=headers,
+    ).json()
+    bulk = client.post(
+        "/invoices/bulk",
+        json={
+            "invoices": [
+                invoice_payload({product: 1}, customer_id=other_customer),
+                invoice_payload({product: 4}, status="paid"),
+            ]
+        },
+        headers=headers,
+    ).json()
+    assert bulk["created"] == 2
+    assert _report(client, headers) == _expected(client, headers)
+
+    # Totals, status, month and customer changes move revenue between rows
+    client.patch(
+        f"/invoices/{january['id']}",
+        json={"items": invoice_payload({product: 5})["items"], "tax_rate": 0.1},
+        headers=headers,
+    )
+    client.patch(
+        f"/invoices/{february['id']}",
+        json={"issue_date": "2025-03-01T00:00:00", "customer_id": other_customer},
+        headers=headers,
+    )
+    client.post(
+        "/invoices/status",
+        json={"status": "cancelled", "filter": {"status": "pending"}},
+        headers=headers,
+    )
+    assert _report(client, headers) == _expected(client, headers)
+
+    client.delete(f"/invoices/{bulk['results'][1]['id']}", headers=headers)
+    expected = _expected(client, headers)
+    assert _report(client, headers) == expected
+
+    rebuild_revenue_rollups()
+    assert _report(client, headers) == expected
+
+
+def test_report_filters_and_dimensions(client, headers, make_product, invoice_payload):
+    product = make_product(quantity_in_stock=1000)
+    for month, status in [("01", "pending"), ("01", "paid"), ("03", "paid")]:
+        client.post(
+            "/invoices",
+            json=invoice_payload(
+                {product: 1}, status=status, issue_date=f"2025-{month}-10T00:00:00"
+            ),
+            headers=headers,
+        )
+
+    rows = client.get(
+        "/reports/revenue",
+        params={"group_by": ["month"], "status": "paid"},
+        headers=headers,
+    ).json()
+    assert [(row["month"], row["invoice_count"]) for row in rows] == [
+        ("2025-01-01", 1),
+        ("2025-03-01", 1),
+    ]
+
+    rows = client.get(
+        "/reports/revenue",
+        params={"group_by": ["status"], "from_month": "2025-02-15"},
+        headers=headers,
+    ).json()
+    assert [(row["status"], row["total"]) for row in rows] == [("paid", 10.0)]
@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+
+from utils.revocation import revocation_list
+
+EXPIRES_AT = datetime.utcnow() + timedelta(hours=1)
+
+
+def test_revocation_applies_on_commit(db):
+    revocation_list.revoke(db, "committed", EXPIRES_AT)
+    revocation_list.bump_epoch(db, 1, 3)
+    assert not revocation_list.is_revoked("committed")
+    assert revocation_list.epoch(1) == 0
+
+    db.commit()
+    assert revocation_list.is_revoked("committed")
+    assert revocation_list.epoch(1) == 3
+
+
+def test_rolled_back_revocation_is_dropped(db):
+    revocation_list.revoke(db, "rolled-back", EXPIRES_AT)
+    revocation_list.bump_epoch(db, 1, 3)
+    db.rollback()
+
+    db.commit()
+    assert not revocation_list.is_revoked("rolled-back")
+    assert revocation_list.epoch(1) == 0
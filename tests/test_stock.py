@@ -0,0 +1,165 @@
+import pytest
+
+from models.product import Product
+
+
+@pytest.fixture
+def stock(client, headers):
+    def stock(product_id):
+        response = client.get(f"/products/{product_id}", headers=headers)
+        return response.json()["quantity_in_stock"]
+
+    return stock
+
+
+def test_pending_invoice_reserves_stock(
+    client, headers, make_product, invoice_payload, stock
+):
+    product = make_product(quantity_in_stock=10)
+
+    response = client.post(
+        "/invoices", json=invoice_payload({product: 3}), headers=headers
+    )
+
+    assert response.status_code == 200, response.text
+    assert stock(product) == 7
+
+
+def test_draft_invoice_does_not_reserve_stock(
+    client, headers, make_product, invoice_payload, stock
+):
+    product = make_product(quantity_in_stock=10)
+
+    client.post(
+        "/invoices", json=invoice_payload({product: 3}, status="draft"), headers=headers
+    )
+
+    assert stock(product) == 10
+
+
+def test_shortfall_is_a_conflict_and_leaves_stock_unchanged(
+    client, headers, make_product, invoice_payload, stock
+):
+    enough = make_product("SKU-1", quantity_in_stock=10)
+    short = make_product("SKU-2", quantity_in_stock=2)
+
+    response = client.post(
+        "/invoices", json=invoice_payload({enough: 3, short: 5}), headers=headers
+    )
+
+    assert response.status_code == 409
+    assert str(short) in response.json()["detail"]
+    assert (stock(enough), stock(short)) == (10, 2)
+    assert client.get("/invoices", headers=headers).json() == []
+
+
+def test_bulk_create_reserves_stock_of_the_invoices_that_fit(
+    client, headers, make_product, invoice_payload, stock
+):
+    product = make_product(quantity_in_stock=10)
+    invoices = [invoice_payload({product: 6}), invoice_payload({product: 6})]
+
+    response = client.post(
+        "/invoices/bulk", json={"invoices": invoices}, headers=headers
+    )
+
+    assert (response.json()["created"], response.json()["failed"]) == (1, 1)
+    assert stock(product) == 4
+
+
+def test_cancelling_releases_stock(
+    client, headers, make_product, invoice_payload, stock
+):
+    product = make_product(quantity_in_stock=10)
+    invoice = client.post(
+        "/invoices", json=invoice_payload({product: 3}), headers=headers
+    ).json()
+
+    response = client.post(
+        "/invoices/status",
+        json={"status": "cancelled", "ids": [invoice["id"]]},
+        headers=headers,
+    )
+
+    assert response.json()["updated"] == [invoice["id"]]
+    assert stock(product) == 10
+
+
+def test_editing_items_reserves_the_new_quantities(
+    client, headers, make_product, invoice_payload, stock
+):
+    kept = make_product("SKU-1", quantity_in_stock=10)
+    dropped = make_product("SKU-2", quantity_in_stock=10)
+    added = make_product("SKU-3", quantity_in_stock=10)
+    invoice = client.post(
+        "/invoices", json=invoice_payload({kept: 3, dropped: 2}), headers=headers
+    ).json()
+
+    response = client.patch(
+        f"/invoices/{invoice['id']}",
+        json={"items": invoice_payload({kept: 5, added: 4})["items"]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200, response.text
+    assert (stock(kept), stock(dropped), stock(added)) == (5, 10, 6)
+
+
+def test_failed_edit_leaves_stock_unchanged(
+    client, headers, make_product, invoice_payload, stock
+):
+    product = make_product(quantity_in_stock=10)
+    invoice = client.post(
+        "/invoices", json=invoice_payload({product: 3}), headers=headers
+    ).json()
+
+    response = client.patch(
+        f"/invoices/{invoice['id']}",
+        json={"items": invoice_payload({product: 11})["items"]},
+        headers=headers,
+    )
+
+    assert response.status_code == 409
+    assert stock(product) == 7
+
+
+def test_patching_status_moves_stock(
+    client, headers, make_product, invoice_payload, stock
+):
+    product = make_product(quantity_in_stock=10)
+    invoice = client.post(
+        "/invoices", json=invoice_payload({product: 3}, status="draft"), headers=headers
+    ).json()
+    url = f"/invoices/{invoice['id']}"
+
+    client.patch(url, json={"status": "pending"}, headers=headers)
+    assert stock(product) == 7
+    client.patch(url, json={"status": "cancelled"}, headers=headers)
+    assert stock(product) == 10
+
+
+def test_deleting_releases_stock(client, headers, make_product, invoice_payload, stock):
+    product = make_product(quantity_in_stock=10)
+    invoice = client.post(
+        "/invoices", json=invoice_payload({product: 3}), headers=headers
+    ).json()
+
+    client.delete(f"/invoices/{invoice['id']}", headers=headers)
+
+    assert stock(product) == 10
+
+
+def test_restocking_clears_the_low_stock_notification(
+    client, headers, db, make_product, invoice_payload
+):
+    product = make_product(quantity_in_stock=10, reorder_level=5)
+    invoice = client.post(
+        "/invoices", json=invoice_payload({product: 6}), headers=headers
+    ).json()
+    db.get(Product, product).low_stock_notified = True
+    db.commit()
+
+    client.delete(f"/invoices/{invoice['id']}", headers=headers)
+
+    db.expire_all()
+    assert db.get(Product, product).low_stock_notified is False
@@ -3,3 +3,5 @@ from .auth import (
     get_password_hash,
     verify_password,
 )
+from .auth_cache import UserContext, auth_cache
+from .hashing import password_hasher
@@ -0,0 +1,170 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from config import AGING_REPORT_REFRESH_SECONDS, SessionLocal
+from models.enums import InvoiceStatus
+from models.invoice import Invoice
+
+# Bucket name and the most days overdue it covers; "current" is not yet due
+AGING_BUCKETS = [("current", 0), ("1-30", 30), ("31-60", 60), ("61-90", 90)]
+OLDEST_BUCKET = "90+"
+BUCKET_NAMES = [name for name, _ in AGING_BUCKETS] + [OLDEST_BUCKET]
+
+
+def compute_aging_report(db: Session, organization_id: int) -> dict:
+    """
+    Bucket an organization's pending invoices by how long they are overdue.
+
+    A single aggregate over the organization's pending invoices, which the
+    (organization_id, status, due_date) index covers.
+
+    Args:
+        db: Database session
+        organization_id: The organization's ID
+
+    Returns:
+        The report as of now, in total and per client
+    """
+    as_of = datetime.utcnow()
+    bucket = case(
+        *[
+            (Invoice.due_date >= as_of - timedelta(days=days), name)
+            for name, days in AGING_BUCKETS
+        ],
+        else_=OLDEST_BUCKET,
+    )
+    rows = db.execute(
+        select(
+            Invoice.client_id,
+            bucket.label("bucket"),
+            func.count().label("invoice_count"),
+            func.sum(Invoice.total).label("amount"),
+        )
+        .where(
+            Invoice.organization_id == organization_id,
+            Invoice.status == InvoiceStatus.PENDING,
+        )
+        .group_by(Invoice.client_id, bucket)
+    )
+
+    totals = _empty_buckets()
+    clients = {}
+    for client_id, name, invoice_count, amount in rows:
+        for buckets in (totals, clients.setdefault(client_id, _empty_buckets())):
+            buckets[name]["invoice_count"] += invoice_count
+            buckets[name]["amount"] += amount
+    return {
+        "as_of": as_of,
+        "buckets": totals,
+        "clients": [
+            {"customer_id": client_id, "buckets": buckets}
+            for client_id, buckets in sorted(clients.items())
+        ],
+    }
+
+
+def _empty_buckets() -> dict:
+    return {name: {"invoice_count": 0, "amount": 0.0} for name in BUCKET_NAMES}
+
+
+class AgingReportCache:
+    """
+    Per-process snapshots of the organizations' aging reports.
+
+    A snapshot is served until it is ``refresh_seconds`` old or an invoice of
+    the organization is written through this process. ``refresh`` recomputes
+    the snapshots of recently polled organizations in the background, so a
+    polling dashboard is normally answered from memory. Writes made through
+    other workers show up at the next refresh.
+
+    Snapshots are shared by every user of an organization, so they are
+    always computed on the primary: one computed on a lagging replica right
+    after a write would be served to everyone until the next refresh.
+    """
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._snapshots: dict[int, tuple[float, dict]] = {}
+        self._last_read: dict[int, float] = {}
+        # Bumped by invalidate, so a report computed before a write is not
+        # stored after it
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, db: Session, organization_id: int) -> dict:
+        """
+        Return the organization's aging report, computing it if needed.
+
+        Args:
+            db: Session on the primary, used on a miss
+            organization_id: The organization's ID
+
+        Returns:
+            The report from ``compute_aging_report``
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._last_read[organization_id] = now
+            snapshot = self._snapshots.get(organization_id)
+            if snapshot is not None and snapshot[0] > now - self.refresh_seconds:
+                self.hits += 1
+                return snapshot[1]
+            self.misses += 1
+            version = self._versions.get(organization_id, 0)
+
+        report = compute_aging_report(db, organization_id)
+        self._store(organization_id, version, now, report)
+        return report
+
+    def invalidate(self, organization_id: int) -> None:
+        """Drop an organization's snapshot after one of its invoices changed."""
+        with self._lock:
+            self._snapshots.pop(organization_id, None)
+            self._versions[organization_id] = self._versions.get(organization_id, 0) + 1
+
+    def refresh(self) -> None:
+        """Recompute the snapshots of organizations polled recently."""
+        cutoff = time.monotonic() - 2 * self.refresh_seconds
+        with self._lock:
+            for organization_id, last_read in list(self._last_read.items()):
+                if last_read < cutoff:
+                    del self._last_read[organization_id]
+                    self._snapshots.pop(organization_id, None)
+                    self._versions.pop(organization_id, None)
+            organization_ids = list(self._last_read)
+
+        if not organization_ids:
+            return
+        db = SessionLocal()
+        try:
+            for organization_id in organization_ids:
+                with self._lock:
+                    version = self._versions.get(organization_id, 0)
+                started = time.monotonic()
+                report = compute_aging_report(db, organization_id)
+                self._store(organization_id, version, started, report)
+        finally:
+            db.close()
+
+    def _store(
+        self, organization_id: int, version: int, computed_at: float, report: dict
+    ) -> None:
+        with self._lock:
+            if self._versions.get(organization_id, 0) == version:
+                self._snapshots[organization_id] = (computed_at, report)
+
+    def stats(self) -> dict:
+        return {
+            "snapshots": len(self._snapshots),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+aging_reports = AgingReportCache(AGING_REPORT_REFRESH_SECONDS)
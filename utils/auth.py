@@ -4,6 +4,8 @@ from typing import Optional
 
 import jwt
 from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from config import (
@@ -11,9 +13,20 @@ from config import (
     ALGORITHM,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     REFRESH_TOKEN_EXPIRE_DAYS,
-    get_db, pwd_context, oauth2_scheme,
+    TOKEN_REVOCATION_MODE,
+    SessionLocal,
+    get_db,
+    get_async_db,
+    pwd_context,
+    oauth2_scheme,
 )
 from models.user import User, Token
+from .auth_cache import UserContext, auth_cache
+from .revocation import revocation_list
+
+# Request sessions are tagged with the authenticated user's id under this key,
+# so commits can be attributed to the user that made them
+SESSION_USER_KEY = "user_id"
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -38,18 +51,19 @@ def create_tokens(user_id: int, db: Session) -> dict[str, str]:
     # Create JWT claims
     access_jti = str(uuid.uuid4())
     refresh_jti = str(uuid.uuid4())
+    epoch = db.query(User.token_epoch).filter(User.id == user_id).scalar() or 0
 
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_token(
-        data={"sub": str(user_id), "jti": access_jti},
+        data={"sub": str(user_id), "jti": access_jti, "epoch": epoch},
         expires_delta=access_token_expires,
     )
 
     # Create refresh token
     refresh_token_expires = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     refresh_token = create_token(
-        data={"sub": str(user_id), "jti": refresh_jti},
+        data={"sub": str(user_id), "jti": refresh_jti, "epoch": epoch},
         expires_delta=refresh_token_expires,
     )
 
@@ -96,55 +110,143 @@ def create_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
 
 
 def get_current_user(
-    token: str = Depends(oauth2_scheme),
+    credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
-) -> User:
+) -> UserContext:
     """
     Get the current user from the JWT token.
 
+    Resolved contexts are cached by jti, so repeated calls with the same token
+    skip the database until the cache entry expires or is invalidated. In the
+    stateless revocation mode the tokens table is not consulted at all: the
+    token's epoch and jti are checked against the in-memory revocation list.
+    The request's session is tagged with the user's id, so a write committed
+    through it pins the user's next reads to the primary.
+
     Args:
-        token: The JWT token
+        credentials: The bearer credentials carrying the JWT token
         db: Database session
 
     Returns:
-        The current user
+        The current user's context
 
     Raises:
         HTTPException: If the token is invalid or the user doesn't exist
     """
-    credentials_exception = HTTPException(
+    payload = _decode_access_token(credentials.credentials)
+    context = auth_cache.get(payload["jti"])
+    if context is None:
+        context = _load_user_context(db, payload)
+    db.info[SESSION_USER_KEY] = context.id
+    return context
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserContext:
+    """
+    Async variant of ``get_current_user`` for the async database stack.
+
+    Args:
+        credentials: The bearer credentials carrying the JWT token
+        db: Async database session
+
+    Returns:
+        The current user's context
+
+    Raises:
+        HTTPException: If the token is invalid or the user doesn't exist
+    """
+    payload = _decode_access_token(credentials.credentials)
+    context = auth_cache.get(payload["jti"])
+    if context is None:
+        context = await db.run_sync(_load_user_context, payload)
+    db.info[SESSION_USER_KEY] = context.id
+    return context
+
+
+def resolve_token(token: str) -> UserContext:
+    """
+    Resolve a bearer token outside a route, with the checks of
+    ``get_current_user``.
+
+    Args:
+        token: The JWT token
+
+    Returns:
+        The token user's context
+
+    Raises:
+        HTTPException: If the token is invalid, revoked or expired, or the
+            user doesn't exist
+    """
+    payload = _decode_access_token(token)
+    context = auth_cache.get(payload["jti"])
+    if context is None:
+        with SessionLocal() as db:
+            context = _load_user_context(db, payload)
+    return context
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         jti: str = payload.get("jti")
         if user_id is None or jti is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except jwt.PyJWTError:
-        raise credentials_exception
-
-    # Check if token is blacklisted
-    token_record = (
-        db.query(Token)
-        .filter(
-            Token.jti == jti,
-            Token.revoked == False,
-            Token.expires_at > datetime.utcnow(),
-        )
-        .first()
-    )
-    if not token_record:
-        raise credentials_exception
+        raise _credentials_exception()
+
+    if TOKEN_REVOCATION_MODE == "stateless" and (
+        revocation_list.is_revoked(jti)
+        or payload.get("epoch", 0) < revocation_list.epoch(int(user_id))
+    ):
+        raise _credentials_exception()
+
+    return payload
+
 
-    user = db.query(User).filter(User.id == user_id).first()
+def _load_user_context(db: Session, payload: dict) -> UserContext:
+    user_id = int(payload["sub"])
+    jti = payload["jti"]
+
+    if TOKEN_REVOCATION_MODE == "stateless":
+        user = db.query(User).filter(User.id == user_id).first()
+    else:
+        # Resolve the user through a live (not revoked, not expired) token
+        user = (
+            db.query(User)
+            .join(Token, Token.user_id == User.id)
+            .filter(
+                Token.jti == jti,
+                Token.revoked == False,
+                Token.expires_at > datetime.utcnow(),
+                User.id == user_id,
+            )
+            .first()
+        )
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
-    return user
+    context = UserContext(
+        id=user.id,
+        organization_id=user.organization_id,
+        is_active=user.is_active,
+        is_admin=user.is_admin,
+        is_email_verified=user.is_email_verified,
+    )
+    auth_cache.set(jti, context, payload["exp"])
+    return context
 
 
 def revoke_token(token: str, db: Session) -> None:
@@ -162,6 +264,9 @@ def revoke_token(token: str, db: Session) -> None:
             token_record = db.query(Token).filter(Token.jti == jti).first()
             if token_record:
                 token_record.revoked = True
+                if TOKEN_REVOCATION_MODE == "stateless":
+                    revocation_list.revoke(db, jti, token_record.expires_at)
                 db.commit()
+            auth_cache.invalidate(jti)
     except jwt.PyJWTError:
         pass
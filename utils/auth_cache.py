@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from config import AUTH_CACHE_ENABLED, AUTH_CACHE_MAX_SIZE, AUTH_CACHE_TTL_SECONDS
+
+
+@dataclass(frozen=True, slots=True)
+class UserContext:
+    """The resolved identity of an authenticated request."""
+
+    id: int
+    organization_id: Optional[int]
+    is_active: bool
+    is_admin: bool
+    is_email_verified: bool
+
+
+class AuthContextCache:
+    """
+    Bounded, TTL-based cache of resolved user contexts keyed by token jti.
+
+    Entries never outlive the token they were resolved from. The cache is
+    per process, so a revocation made on another worker is only observed once
+    the entry expires; keep the TTL short.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int, enabled: bool = True):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: OrderedDict[str, tuple[UserContext, float]] = OrderedDict()
+        self._jtis_by_user: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, jti: str) -> Optional[UserContext]:
+        """
+        Return the cached context for a jti, or None on a miss.
+
+        Args:
+            jti: The token's unique identifier
+
+        Returns:
+            The cached user context, if present and not expired
+        """
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(jti)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            context, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(jti)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(jti)
+            self.hits += 1
+            return context
+
+    def set(self, jti: str, context: UserContext, token_expires_at: float) -> None:
+        """
+        Cache a context for a jti.
+
+        Args:
+            jti: The token's unique identifier
+            context: The resolved user context
+            token_expires_at: The token's ``exp`` claim as a unix timestamp
+        """
+        if not self.enabled:
+            return
+
+        ttl = min(self.ttl_seconds, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            if jti in self._entries:
+                self._remove(jti)
+            self._entries[jti] = (context, time.monotonic() + ttl)
+            self._jtis_by_user.setdefault(context.id, set()).add(jti)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, jti: str) -> None:
+        """Drop the entry for a single token."""
+        with self._lock:
+            if jti in self._entries:
+                self._remove(jti)
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every entry resolved for a user."""
+        with self._lock:
+            for jti in list(self._jtis_by_user.get(user_id, ())):
+                self._remove(jti)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._jtis_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, jti: str) -> None:
+        context, _ = self._entries.pop(jti)
+        jtis = self._jtis_by_user.get(context.id)
+        if jtis is not None:
+            jtis.discard(jti)
+            if not jtis:
+                del self._jtis_by_user[context.id]
+
+
+auth_cache = AuthContextCache(
+    max_size=AUTH_CACHE_MAX_SIZE,
+    ttl_seconds=AUTH_CACHE_TTL_SECONDS,
+    enabled=AUTH_CACHE_ENABLED,
+)
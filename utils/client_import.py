@@ -0,0 +1,117 @@
+from itertools import islice
+from typing import Iterable
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.client import Client
+from models.utils import utcnow
+from schemas.request import ClientCreate
+from .imports import record_import_error, validate_import_row
+from .upsert import upsert
+
+# The whole import is one transaction, so its size is capped
+MAX_IMPORT_CLIENTS = 50000
+# Rows per lookup and per INSERT, well below the bind parameter limits
+STATEMENT_CHUNK_SIZE = 1000
+
+
+def import_clients(
+    db: Session, organization_id: int, rows: Iterable[tuple[int, object]]
+) -> dict:
+    """
+    Validate rows against ``ClientCreate`` and upsert them by email.
+
+    Rows are de-duplicated by email first, the later row winning. The
+    emails the organization already has are then looked up, and all clients
+    are written with multi-row INSERT ... ON CONFLICT (organization_id,
+    email) DO UPDATE statements in a single transaction: either the whole
+    import is committed or none of it. Existing clients only get the fields
+    the row provides.
+
+    Args:
+        db: Database session
+        organization_id: The organization the clients belong to
+        rows: (line number, row) pairs, see ``parse_import_rows``
+
+    Returns:
+        Counts of processed, created, updated and rejected rows, and the
+        errors of the first ``MAX_REPORTED_ERRORS`` rejected rows
+
+    Raises:
+        HTTPException: 413 if there are more than ``MAX_IMPORT_CLIENTS`` rows
+    """
+    result = {"processed": 0, "created": 0, "updated": 0, "rejected": 0, "errors": []}
+    clients = {}
+    for line, row in rows:
+        result["processed"] += 1
+        if result["processed"] > MAX_IMPORT_CLIENTS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Imports are limited to {MAX_IMPORT_CLIENTS} clients",
+            )
+        client, error = validate_import_row(ClientCreate, row)
+        if error is None and client.email is None:
+            error = "email: Field required to match clients"
+        if error is None:
+            clients[client.email] = client
+        else:
+            result["rejected"] += 1
+            record_import_error(result["errors"], line, error)
+
+    emails = sorted(clients)
+    existing = set()
+    for chunk in _chunks(emails):
+        existing.update(
+            db.scalars(
+                select(Client.email).where(
+                    Client.organization_id == organization_id,
+                    Client.email.in_(chunk),
+                )
+            )
+        )
+
+    # Written in email order, so concurrent imports lock rows in one order
+    for chunk in _chunks(emails):
+        _upsert_clients(db, organization_id, [clients[email] for email in chunk])
+    db.commit()
+    result["updated"] = len(existing)
+    result["created"] = len(clients) - len(existing)
+    return result
+
+
+def _chunks(values: list) -> Iterable[list]:
+    values = iter(values)
+    while chunk := list(islice(values, STATEMENT_CHUNK_SIZE)):
+        yield chunk
+
+
+def _upsert_clients(
+    db: Session, organization_id: int, clients: Iterable[ClientCreate]
+) -> None:
+    # Rows of one statement must provide the same fields
+    groups = {}
+    for client in clients:
+        groups.setdefault(frozenset(client.model_fields_set), []).append(client)
+
+    table = Client.__table__
+    for fields, group in groups.items():
+        statement = upsert(db.get_bind().dialect.name, table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.organization_id, table.c.email],
+            set_={
+                **{field: statement.excluded[field] for field in fields - {"email"}},
+                "updated_at": utcnow(),
+            },
+        )
+        db.execute(
+            statement,
+            [
+                {
+                    **client.model_dump(include=fields),
+                    "organization_id": organization_id,
+                }
+                for client in group
+            ],
+        )
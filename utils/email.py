@@ -1,4 +1,5 @@
 from email.mime.text import MIMEText
+from html import escape
 from email.mime.multipart import MIMEMultipart
 import smtplib
 import os
@@ -61,5 +62,54 @@ class EmailService:
                 detail=f"Failed to send verification email: {str(e)}",
             )
 
+    def send_low_stock_email(self, emails: list[str], products: list) -> None:
+        """
+        Send the list of products that fell to their reorder level.
+
+        Args:
+            emails: Recipients' email addresses
+            products: The products, with their stock and reorder level
+        """
+        if not all([self.smtp_username, self.smtp_password, self.from_email]):
+            raise HTTPException(
+                status_code=500,
+                detail="Email configuration is incomplete",
+            )
+
+        message = MIMEMultipart()
+        message["From"] = self.from_email
+        message["To"] = ", ".join(emails)
+        message["Subject"] = f"{len(products)} products are low on stock"
+
+        rows = "".join(
+            f"<tr><td>{escape(product.sku or '')}</td><td>{escape(product.name)}</td>"
+            f"<td>{product.quantity_in_stock}</td><td>{product.reorder_level}</td></tr>"
+            for product in products
+        )
+        body = f"""
+        <html>
+            <body>
+                <h2>Products low on stock</h2>
+                <table>
+                    <tr><th>SKU</th><th>Name</th><th>In stock</th><th>Reorder level</th></tr>
+                    {rows}
+                </table>
+            </body>
+        </html>
+        """
+
+        message.attach(MIMEText(body, "html"))
+
+        try:
+            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                server.starttls()
+                server.login(self.smtp_username, self.smtp_password)
+                server.send_message(message)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to send low stock email: {str(e)}",
+            )
+
 
 email_service = EmailService()
@@ -0,0 +1,167 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import Select, select
+
+from models.enums import InvoiceStatus
+from models.invoice import Invoice, InvoiceItem
+
+# Rows fetched per round-trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+
+INVOICE_COLUMNS = [
+    Invoice.id.label("invoice_id"),
+    Invoice.invoice_number,
+    Invoice.status,
+    Invoice.issue_date,
+    Invoice.due_date,
+    Invoice.client_id.label("customer_id"),
+    Invoice.subtotal,
+    Invoice.tax_rate,
+    Invoice.tax_amount,
+    Invoice.total,
+    Invoice.notes,
+]
+ITEM_COLUMNS = [
+    InvoiceItem.id.label("item_id"),
+    InvoiceItem.product_id,
+    InvoiceItem.quantity,
+    InvoiceItem.unit_price,
+    InvoiceItem.subtotal.label("item_subtotal"),
+]
+EXPORT_FIELDS = [column.key for column in INVOICE_COLUMNS + ITEM_COLUMNS]
+
+
+def invoice_export_query(
+    organization_id: int,
+    status: Optional[InvoiceStatus] = None,
+    issued_from: Optional[datetime] = None,
+    issued_to: Optional[datetime] = None,
+) -> Select:
+    """
+    Build the query behind the invoice exports.
+
+    Produces one row per line item, with the invoice's columns repeated, and
+    one row with empty item columns for invoices without items. Rows are
+    ordered by invoice, so an invoice's items are always adjacent.
+
+    Args:
+        organization_id: The organization whose invoices are exported
+        status: Only export invoices with this status
+        issued_from: Only export invoices issued at or after this time
+        issued_to: Only export invoices issued before this time
+
+    Returns:
+        The export query
+    """
+    query = (
+        select(*INVOICE_COLUMNS, *ITEM_COLUMNS)
+        .outerjoin(InvoiceItem, InvoiceItem.invoice_id == Invoice.id)
+        .order_by(Invoice.id, InvoiceItem.id)
+    )
+    return filter_invoices(query, organization_id, status, issued_from, issued_to)
+
+
+def filter_invoices(
+    query: Select,
+    organization_id: int,
+    status: Optional[InvoiceStatus] = None,
+    issued_from: Optional[datetime] = None,
+    issued_to: Optional[datetime] = None,
+) -> Select:
+    """Restrict a query that selects from invoices to the exported ones."""
+    query = query.where(Invoice.organization_id == organization_id)
+    if status is not None:
+        query = query.where(Invoice.status == status)
+    if issued_from is not None:
+        query = query.where(Invoice.issue_date >= issued_from)
+    if issued_to is not None:
+        query = query.where(Invoice.issue_date < issued_to)
+    return query
+
+
+def stream_export_rows(
+    session_factory, query: Select, batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[list]:
+    """
+    Run an export query on a server-side cursor and yield batches of rows.
+
+    The session is opened here rather than taken from the request, because
+    the rows are produced while the response is being sent.
+
+    Args:
+        session_factory: Factory for the session to read with
+        query: The export query
+        batch_size: Rows fetched per round-trip
+
+    Yields:
+        Lists of at most ``batch_size`` row mappings
+    """
+    db = session_factory()
+    try:
+        result = db.execute(query.execution_options(yield_per=batch_size))
+        for partition in result.mappings().partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def to_csv(batches: Iterator[list]) -> Iterator[str]:
+    """Encode row batches as CSV, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for batch in batches:
+        writer.writerows(_plain(row) for row in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def to_ndjson(batches: Iterator[list]) -> Iterator[str]:
+    """Encode row batches as NDJSON, one invoice per line with its items."""
+    invoice = None
+    for batch in batches:
+        lines = []
+        for row in batch:
+            row = _plain(row)
+            if invoice is None or invoice["id"] != row["invoice_id"]:
+                if invoice is not None:
+                    lines.append(json.dumps(invoice))
+                invoice = _ndjson_invoice(row)
+            if row["item_id"] is not None:
+                invoice["items"].append(_ndjson_item(row))
+        yield "".join(f"{line}\n" for line in lines)
+    if invoice is not None:
+        yield json.dumps(invoice) + "\n"
+
+
+def _plain(row) -> dict:
+    """Convert a row's values to JSON and CSV friendly types."""
+    values = dict(row)
+    values["status"] = values["status"].value if values["status"] else None
+    for field in ("issue_date", "due_date"):
+        values[field] = values[field].isoformat()
+    return values
+
+
+def _ndjson_invoice(row: dict) -> dict:
+    return {
+        "id": row["invoice_id"],
+        **{column.key: row[column.key] for column in INVOICE_COLUMNS[1:]},
+        "items": [],
+    }
+
+
+def _ndjson_item(row: dict) -> dict:
+    return {
+        "id": row["item_id"],
+        "product_id": row["product_id"],
+        "quantity": row["quantity"],
+        "unit_price": row["unit_price"],
+        "subtotal": row["item_subtotal"],
+    }
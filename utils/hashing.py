@@ -0,0 +1,78 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+
+from config import PASSWORD_HASH_MAX_PENDING, PASSWORD_HASH_WORKERS, pwd_context
+from metrics import Histogram
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated, bounded thread pool.
+
+    Password hashing is deliberately slow, so running it on the shared anyio
+    threadpool lets a burst of logins starve every other sync endpoint. bcrypt
+    releases the GIL, so a small dedicated thread pool gets full CPU
+    parallelism without the pickling overhead of a process pool. Work beyond
+    ``max_workers + max_pending`` is rejected immediately with a 503.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash"
+        )
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self.queue_wait = Histogram()
+        self.hash_time = Histogram()
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(pwd_context.verify, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "hash_seconds": self.hash_time.snapshot(),
+        }
+
+    async def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            self.queue_wait.observe(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                self.hash_time.observe(time.perf_counter() - started)
+
+        # The slot is held until the hash actually finishes, even if the
+        # awaiting request is cancelled in the meantime
+        future = self._executor.submit(job)
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+
+password_hasher = PasswordHasher(
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+)
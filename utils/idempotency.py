@@ -0,0 +1,362 @@
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Engine, delete, select, tuple_, update
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from config import IDEMPOTENCY_KEY_TTL_SECONDS, IDEMPOTENCY_LOCK_SECONDS, engine
+from models.idempotency import IdempotencyKey
+from models.utils import utcnow
+from .auth import resolve_token
+from .scheduler import advisory_lock
+from .upsert import upsert
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+PURGE_BATCH_SIZE = 5000
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    content_type: Optional[str]
+    body: bytes
+
+
+class IdempotencyError(Exception):
+    """A request that reuses a key but cannot be executed or replayed."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class IdempotencyStore:
+    """
+    Responses of requests made with an idempotency key, per user and key.
+
+    The first request with a key claims it by inserting an in-flight row; a
+    retry with the same key waits until that row holds the response and
+    replays it, without running the request again. Claims, completions and
+    lookups are single statements in their own transactions, so no lock is
+    held while the request itself runs.
+    """
+
+    def __init__(self, bind: Engine, ttl_seconds: int, lock_seconds: float):
+        self.bind = bind
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self.executed = 0
+        self.replayed = 0
+        self.rejected = 0
+
+    async def acquire(
+        self, user_id: int, key: str, request_hash: str
+    ) -> Optional[StoredResponse]:
+        """
+        Claim a key, or wait for the response of the request that claimed it.
+
+        Args:
+            user_id: The requesting user's ID
+            key: The idempotency key
+            request_hash: Fingerprint of the request
+
+        Returns:
+            None if the key was claimed and the request should run, otherwise
+            the stored response to replay
+
+        Raises:
+            IdempotencyError: If the key was used for a different request, or
+                its request is still in flight after the lock timeout
+        """
+        deadline = time.monotonic() + self.lock_seconds
+        delay = 0.01
+        while True:
+            claimed, row = await run_in_threadpool(
+                self._claim, user_id, key, request_hash
+            )
+            if claimed:
+                self.executed += 1
+                return None
+            if row is not None and row.request_hash != request_hash:
+                self.rejected += 1
+                raise IdempotencyError(
+                    422, "Idempotency key was already used for a different request"
+                )
+            if row is not None and row.status_code is not None:
+                self.replayed += 1
+                return StoredResponse(
+                    row.status_code, row.content_type, row.response_body
+                )
+            if time.monotonic() >= deadline:
+                self.rejected += 1
+                raise IdempotencyError(
+                    409, "A request with this idempotency key is still in progress"
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    async def complete(self, user_id: int, key: str, response: StoredResponse) -> None:
+        """Store the response of a claimed key for replays."""
+        await run_in_threadpool(self._complete, user_id, key, response)
+
+    async def release(self, user_id: int, key: str) -> None:
+        """Drop the claim of a request that failed, so a retry runs it again."""
+        await run_in_threadpool(self._release, user_id, key)
+
+    def purge(self, batch_size: int = PURGE_BATCH_SIZE) -> int:
+        """
+        Delete expired keys in bounded batches. Only one worker purges at a
+        time.
+
+        Returns:
+            The number of deleted keys
+        """
+        deleted = 0
+        with self.bind.connect() as connection:
+            with advisory_lock(connection, "purge_idempotency_keys") as acquired:
+                if not acquired:
+                    return deleted
+                expired = IdempotencyKey.expires_at < utcnow()
+                while True:
+                    batch = (
+                        select(IdempotencyKey.user_id, IdempotencyKey.key)
+                        .where(expired)
+                        .limit(batch_size)
+                    )
+                    rowcount = connection.execute(
+                        delete(IdempotencyKey).where(
+                            tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(
+                                batch
+                            )
+                        )
+                    ).rowcount
+                    connection.commit()
+                    deleted += rowcount
+                    if rowcount < batch_size:
+                        return deleted
+
+    def stats(self) -> dict:
+        return {
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "rejected": self.rejected,
+        }
+
+    def _claim(self, user_id: int, key: str, request_hash: str):
+        """Insert an in-flight row, taking over an expired one; else load it."""
+        now = utcnow()
+        table = IdempotencyKey.__table__
+        values = {
+            "user_id": user_id,
+            "key": key,
+            "request_hash": request_hash,
+            "status_code": None,
+            "content_type": None,
+            "response_body": None,
+            "created_at": now,
+            "expires_at": now + timedelta(seconds=self.lock_seconds),
+        }
+        statement = upsert(self.bind.dialect.name, table).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.key],
+            set_={name: statement.excluded[name] for name in values},
+            where=table.c.expires_at < now,
+        ).returning(table.c.key)
+        with self.bind.begin() as connection:
+            if connection.execute(statement).first() is not None:
+                return True, None
+            row = connection.execute(
+                select(
+                    table.c.request_hash,
+                    table.c.status_code,
+                    table.c.content_type,
+                    table.c.response_body,
+                ).where(table.c.user_id == user_id, table.c.key == key)
+            ).first()
+        return False, row
+
+    def _complete(self, user_id: int, key: str, response: StoredResponse) -> None:
+        with self.bind.begin() as connection:
+            connection.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+                .values(
+                    status_code=response.status_code,
+                    content_type=response.content_type,
+                    response_body=response.body,
+                    expires_at=utcnow() + timedelta(seconds=self.ttl_seconds),
+                )
+            )
+
+    def _release(self, user_id: int, key: str) -> None:
+        with self.bind.begin() as connection:
+            connection.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status_code.is_(None),
+                )
+            )
+
+
+class IdempotencyMiddleware:
+    """
+    Makes POST requests to the given paths idempotent when they carry an
+    ``Idempotency-Key`` header.
+
+    Keys are scoped to the user of the bearer token. Responses below 500 are
+    stored and replayed, with an ``Idempotent-Replayed`` header, to retries
+    with the same key and request body; those retries never reach the route,
+    so the token is checked here as the route's auth dependency would, and
+    once more before a replay. Requests without the header, or without a
+    bearer token, are passed through untouched.
+    """
+
+    def __init__(
+        self, app, paths: Iterable[str], store: Optional[IdempotencyStore] = None
+    ):
+        self.app = app
+        self.paths = set(paths)
+        self.store = store or idempotency_store
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_KEY_HEADER)
+        token = _bearer_token(headers.get("authorization"))
+        if key is None or token is None:
+            return await self.app(scope, receive, send)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return await _send_json(
+                send,
+                400,
+                {"detail": f"Idempotency key must be 1 to {MAX_KEY_LENGTH} characters"},
+            )
+        user_id = await _live_user_id(token)
+        if user_id is None:
+            return await _send_unauthorized(send)
+
+        body = await _read_body(receive)
+        request_hash = hashlib.sha256(
+            b"\n".join([scope["method"].encode(), scope["path"].encode(), body])
+        ).hexdigest()
+        try:
+            stored = await self.store.acquire(user_id, key, request_hash)
+        except IdempotencyError as exc:
+            return await _send_json(send, exc.status_code, {"detail": exc.detail})
+        if stored is not None:
+            # The token may have been revoked while the claim was awaited
+            if await _live_user_id(token) != user_id:
+                return await _send_unauthorized(send)
+            return await _send_stored(send, stored)
+
+        response = StoredResponse(0, None, b"")
+
+        async def replay_body():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response.status_code = message["status"]
+                response.content_type = Headers(raw=message["headers"]).get(
+                    "content-type"
+                )
+            elif message["type"] == "http.response.body":
+                response.body += message.get("body", b"")
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            await self.store.release(user_id, key)
+            raise
+        if 0 < response.status_code < 500:
+            await self.store.complete(user_id, key, response)
+        else:
+            await self.store.release(user_id, key)
+
+
+def _bearer_token(authorization: Optional[str]) -> Optional[str]:
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token
+
+
+async def _live_user_id(token: str) -> Optional[int]:
+    """The user of a live token of an active user, otherwise None."""
+    try:
+        context = await run_in_threadpool(resolve_token, token)
+    except HTTPException:
+        return None
+    return context.id if context.is_active else None
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _send_stored(send, stored: StoredResponse) -> None:
+    await _send(
+        send,
+        stored.status_code,
+        stored.content_type,
+        stored.body,
+        [(REPLAYED_HEADER.lower().encode(), b"true")],
+    )
+
+
+async def _send_unauthorized(send) -> None:
+    await _send(
+        send,
+        401,
+        "application/json",
+        json.dumps({"detail": "Could not validate credentials"}).encode(),
+        [(b"www-authenticate", b"Bearer")],
+    )
+
+
+async def _send_json(send, status_code: int, content: dict) -> None:
+    await _send(send, status_code, "application/json", json.dumps(content).encode())
+
+
+async def _send(
+    send,
+    status_code: int,
+    content_type: Optional[str],
+    body: bytes,
+    headers: Optional[list] = None,
+) -> None:
+    headers = [(b"content-length", str(len(body)).encode()), *(headers or [])]
+    if content_type:
+        headers.append((b"content-type", content_type.encode()))
+    await send(
+        {"type": "http.response.start", "status": status_code, "headers": headers}
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+idempotency_store = IdempotencyStore(
+    engine, IDEMPOTENCY_KEY_TTL_SECONDS, IDEMPOTENCY_LOCK_SECONDS
+)
@@ -0,0 +1,75 @@
+import codecs
+import csv
+import json
+from typing import BinaryIO, Iterator, Optional
+
+from pydantic import BaseModel, ValidationError
+
+IMPORT_FORMATS = ("csv", "ndjson")
+# Errors beyond this many are counted but not reported individually
+MAX_REPORTED_ERRORS = 1000
+
+
+def parse_import_rows(stream: BinaryIO, format: str) -> Iterator[tuple[int, object]]:
+    """
+    Parse an uploaded import file one row at a time.
+
+    CSV files need a header row naming the schema's fields; empty cells are
+    treated as absent. NDJSON files hold one object per line.
+
+    Args:
+        stream: The file, opened in binary mode
+        format: "csv" or "ndjson"
+
+    Returns:
+        An iterator of (line number, row) pairs, where row is the field
+        values, or the error message of a row that could not be parsed
+    """
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {
+                field: value
+                for field, value in row.items()
+                if field is not None and value not in ("", None)
+            }
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            row = "Expected a JSON object"
+        yield line_number, row
+
+
+def validate_import_row(
+    schema: type[BaseModel], row: object
+) -> tuple[Optional[BaseModel], Optional[str]]:
+    """
+    Validate a parsed row against a request schema.
+
+    Returns:
+        The model and None, or None and the row's error message
+    """
+    if isinstance(row, str):
+        return None, row
+    try:
+        return schema.model_validate(row), None
+    except ValidationError as exc:
+        return None, "; ".join(
+            f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}"
+            for detail in exc.errors()
+        )
+
+
+def record_import_error(errors: list[dict], line: int, error: str) -> None:
+    """List a rejected row, unless the report is full already."""
+    if len(errors) < MAX_REPORTED_ERRORS:
+        errors.append({"line": line, "error": error})
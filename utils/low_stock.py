@@ -0,0 +1,100 @@
+import logging
+from collections import defaultdict
+
+from sqlalchemy import select, update
+
+from config import engine
+from models.product import Product
+from models.user import User
+from .email import email_service
+from .scheduler import advisory_lock
+
+logger = logging.getLogger(__name__)
+
+# Must stay identical to the predicate of the partial ix_products_low_stock
+# index for the index to answer it
+LOW_STOCK = Product.quantity_in_stock <= Product.reorder_level
+
+NOTIFY_BATCH_SIZE = 1000
+
+
+def is_low_on_stock(product: Product) -> bool:
+    # Same NULL semantics as LOW_STOCK: without a stock or reorder level
+    # recorded, the product is not low
+    if product.quantity_in_stock is None or product.reorder_level is None:
+        return False
+    return product.quantity_in_stock <= product.reorder_level
+
+
+def notify_low_stock(batch_size: int = NOTIFY_BATCH_SIZE) -> dict:
+    """
+    Email each organization's admins the products that fell to their reorder
+    level since the last run.
+
+    Only the products in the partial low-stock index are read, never the
+    whole catalog. A product is reported once until its stock goes back above
+    its reorder level; products of an organization whose email failed are
+    reported again on the next run. Only one worker notifies at a time.
+
+    Args:
+        batch_size: Maximum number of products reported per run
+
+    Returns:
+        The number of products reported and of organizations emailed
+    """
+    result = {"products": 0, "organizations": 0, "skipped": False}
+
+    with engine.connect() as connection:
+        with advisory_lock(connection, "notify_low_stock") as acquired:
+            if not acquired:
+                result["skipped"] = True
+                return result
+
+            products = connection.execute(
+                select(
+                    Product.id,
+                    Product.organization_id,
+                    Product.sku,
+                    Product.name,
+                    Product.quantity_in_stock,
+                    Product.reorder_level,
+                )
+                .where(LOW_STOCK, Product.low_stock_notified == False)
+                .order_by(Product.organization_id, Product.id)
+                .limit(batch_size)
+            ).all()
+            by_organization = defaultdict(list)
+            for product in products:
+                by_organization[product.organization_id].append(product)
+
+            admins = defaultdict(list)
+            for organization_id, email in connection.execute(
+                select(User.organization_id, User.email).where(
+                    User.organization_id.in_(by_organization),
+                    User.is_admin == True,
+                    User.is_active == True,
+                )
+            ):
+                admins[organization_id].append(email)
+
+            for organization_id, low in by_organization.items():
+                if admins[organization_id]:
+                    try:
+                        email_service.send_low_stock_email(admins[organization_id], low)
+                    except Exception:
+                        logger.exception(
+                            "Low stock email to organization %s failed",
+                            organization_id,
+                        )
+                        continue
+                    result["organizations"] += 1
+
+                connection.execute(
+                    update(Product)
+                    .where(Product.id.in_([product.id for product in low]), LOW_STOCK)
+                    .values(low_stock_notified=True)
+                )
+                connection.commit()
+                result["products"] += len(low)
+
+    return result
@@ -0,0 +1,169 @@
+import threading
+from typing import Optional
+
+from sqlalchemy import Engine, func, select, update
+from sqlalchemy.engine import Connection
+
+from config import INVOICE_NUMBER_BLOCK_SIZE, INVOICE_NUMBER_FORMAT, engine
+from models.invoice import Invoice, InvoiceNumberCounter
+from .upsert import upsert
+
+
+class InvoiceNumberAllocator:
+    """
+    Hands out per-organization invoice numbers from blocks reserved in the
+    ``invoice_number_counters`` table (hi/lo allocation).
+
+    A block is reserved with one upsert in its own short transaction, so the
+    counter row is never locked for the duration of an invoice write, and the
+    numbers in it are then handed out from memory. Numbers are unique across
+    workers, but not gapless: numbers of rolled back invoices and the rest of
+    a block when a worker stops are never used.
+
+    An organization's counter starts after the highest number in the format
+    it already has. Clients may not set numbers in the format themselves
+    (see ``is_generated``), so the counter never runs into one.
+    """
+
+    def __init__(self, bind: Engine, block_size: int, number_format: str):
+        self.bind = bind
+        self.block_size = block_size
+        self.number_format = number_format
+        self._blocks: dict[int, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self.blocks_reserved = 0
+
+    def allocate(self, organization_id: int, count: int = 1) -> list[str]:
+        """
+        Allocate invoice numbers for an organization.
+
+        Args:
+            organization_id: The organization's ID
+            count: How many numbers to allocate
+
+        Returns:
+            The formatted invoice numbers, in increasing order
+        """
+        numbers = []
+        with self._lock:
+            while len(numbers) < count:
+                next_value, end = self._blocks.get(organization_id, (0, 0))
+                if next_value >= end:
+                    size = max(self.block_size, count - len(numbers))
+                    end = self._reserve(organization_id, size)
+                    next_value = end - size
+                taken = min(end - next_value, count - len(numbers))
+                numbers.extend(range(next_value, next_value + taken))
+                self._blocks[organization_id] = (next_value + taken, end)
+        return [self.number_format.format(number=number) for number in numbers]
+
+    def is_generated(self, invoice_number: Optional[str]) -> bool:
+        """Whether a number is in the format the allocator hands out."""
+        return parse_invoice_number(invoice_number, self.number_format) is not None
+
+    def stats(self) -> dict:
+        return {
+            "block_size": self.block_size,
+            "blocks_reserved": self.blocks_reserved,
+            "organizations": len(self._blocks),
+        }
+
+    def _reserve(self, organization_id: int, size: int) -> int:
+        """Reserve ``size`` numbers and return the end of the block (exclusive)."""
+        counter = InvoiceNumberCounter.__table__
+        with self.bind.begin() as connection:
+            end = connection.execute(
+                update(counter)
+                .where(counter.c.organization_id == organization_id)
+                .values(next_value=counter.c.next_value + size)
+                .returning(counter.c.next_value)
+            ).scalar()
+            if end is None:
+                # First block of the organization: start after the numbers
+                # it already has. A concurrent first reservation that wins
+                # the insert turns this one into an increment.
+                start = (
+                    highest_invoice_number(
+                        connection, organization_id, self.number_format
+                    )
+                    + 1
+                )
+                statement = upsert(self.bind.dialect.name, counter).values(
+                    organization_id=organization_id, next_value=start + size
+                )
+                end = connection.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[counter.c.organization_id],
+                        set_={"next_value": counter.c.next_value + size},
+                    ).returning(counter.c.next_value)
+                ).scalar_one()
+        self.blocks_reserved += 1
+        return end
+
+
+def parse_invoice_number(
+    invoice_number: Optional[str], number_format: str = INVOICE_NUMBER_FORMAT
+) -> Optional[int]:
+    """
+    Return the number of an invoice number in the generated format.
+
+    Args:
+        invoice_number: The invoice number
+        number_format: The format, with a ``{number}`` field
+
+    Returns:
+        The number, or None if ``invoice_number`` is not exactly what the
+        format produces for it
+    """
+    prefix, _, rest = number_format.partition("{number")
+    suffix = rest.partition("}")[2]
+    if (
+        invoice_number is None
+        or len(invoice_number) <= len(prefix) + len(suffix)
+        or not invoice_number.startswith(prefix)
+        or not invoice_number.endswith(suffix)
+    ):
+        return None
+    digits = invoice_number[len(prefix) : len(invoice_number) - len(suffix)]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    number = int(digits)
+    if number_format.format(number=number) != invoice_number:
+        return None
+    return number
+
+
+def highest_invoice_number(
+    connection: Connection, organization_id: int, number_format: str
+) -> int:
+    """
+    Return the highest number in the generated format among an
+    organization's invoices, or 0.
+
+    Generated numbers of more digits are higher, and among numbers of one
+    length the order is lexicographic, so the candidates are read in that
+    order and the first one that parses is the highest.
+    """
+    prefix = number_format.partition("{number")[0]
+    candidates = connection.execute(
+        select(Invoice.invoice_number)
+        .where(
+            Invoice.organization_id == organization_id,
+            Invoice.invoice_number.startswith(prefix, autoescape=True),
+        )
+        .order_by(
+            func.length(Invoice.invoice_number).desc(),
+            Invoice.invoice_number.desc(),
+        )
+        .execution_options(yield_per=1000)
+    ).scalars()
+    for invoice_number in candidates:
+        number = parse_invoice_number(invoice_number, number_format)
+        if number is not None:
+            return number
+    return 0
+
+
+invoice_numbers = InvoiceNumberAllocator(
+    engine, INVOICE_NUMBER_BLOCK_SIZE, INVOICE_NUMBER_FORMAT
+)
@@ -0,0 +1,66 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, Response
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded))["id"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def paginate(
+    query: Query,
+    id_column,
+    response: Response,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+) -> list:
+    """
+    Fetch one page of ``query`` ordered by ``id_column``.
+
+    With a cursor, the page starts right after the row the cursor points to,
+    which the (organization_id, id) indexes answer in constant time however
+    deep the page is. Without one, the legacy ``skip`` offset is used. When
+    the page is full, the cursor of the next page is returned in the
+    ``X-Next-Cursor`` response header.
+
+    Args:
+        query: The organization-scoped query to paginate
+        id_column: The unique, ordered column to paginate on
+        response: The response to set the next cursor header on
+        cursor: Opaque cursor returned by a previous page
+        skip: Offset used when no cursor is given
+        limit: Maximum number of rows in the page
+
+    Returns:
+        The rows of the page
+    """
+    query = query.order_by(id_column)
+    if cursor is not None:
+        query = query.filter(id_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit).all()
+    if rows and len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(rows[-1], id_column.key)
+        )
+    return rows
@@ -0,0 +1,99 @@
+from itertools import islice
+from typing import Iterable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.product import Product
+from models.utils import utcnow
+from schemas.request import ProductCreate
+from .imports import record_import_error, validate_import_row
+from .upsert import upsert
+
+# Rows validated and upserted per statement and transaction
+IMPORT_CHUNK_SIZE = 1000
+
+
+def import_products(
+    db: Session,
+    organization_id: int,
+    rows: Iterable[tuple[int, object]],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> dict:
+    """
+    Validate rows against ``ProductCreate`` and upsert them by SKU.
+
+    Rows are consumed ``chunk_size`` at a time: the valid ones of a chunk are
+    written with one INSERT ... ON CONFLICT (organization_id, sku) DO UPDATE
+    and committed, so memory use does not grow with the file. Existing
+    products only get the fields the row provides; new ones get the
+    defaults for the others. When a SKU appears twice in a chunk, the later
+    row wins.
+
+    Args:
+        db: Database session
+        organization_id: The organization the products belong to
+        rows: (line number, row) pairs, see ``parse_import_rows``
+        chunk_size: Rows per statement and transaction
+
+    Returns:
+        Counts of processed, imported and failed rows, and the errors of the
+        first ``MAX_REPORTED_ERRORS`` failed rows
+    """
+    result = {"processed": 0, "imported": 0, "failed": 0, "errors": []}
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        products = {}
+        for line, row in chunk:
+            product, error = validate_import_row(ProductCreate, row)
+            if error is None:
+                products[product.sku] = product
+            else:
+                result["failed"] += 1
+                record_import_error(result["errors"], line, error)
+
+        _upsert_products(db, organization_id, products.values())
+        db.commit()
+        result["processed"] += len(chunk)
+        result["imported"] += len(products)
+    return result
+
+
+def _upsert_products(
+    db: Session, organization_id: int, products: Iterable[ProductCreate]
+) -> None:
+    # Rows of one statement must provide the same fields
+    groups = {}
+    for product in sorted(products, key=lambda product: product.sku):
+        groups.setdefault(frozenset(product.model_fields_set), []).append(product)
+
+    table = Product.__table__
+    for fields, group in groups.items():
+        statement = upsert(db.get_bind().dialect.name, table)
+        quantity, reorder_level = (
+            (
+                statement.excluded[field]
+                if field in fields
+                else func.coalesce(table.c[field], 0)
+            )
+            for field in ("quantity_in_stock", "reorder_level")
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.organization_id, table.c.sku],
+            set_={
+                **{field: statement.excluded[field] for field in fields - {"sku"}},
+                "updated_at": utcnow(),
+                "low_stock_notified": table.c.low_stock_notified
+                & (quantity <= reorder_level),
+            },
+        )
+        db.execute(
+            statement,
+            [
+                {
+                    **product.model_dump(include=fields),
+                    "organization_id": organization_id,
+                }
+                for product in group
+            ],
+        )
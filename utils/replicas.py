@@ -0,0 +1,124 @@
+import itertools
+import threading
+import time
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import (
+    READ_YOUR_WRITES_SECONDS,
+    AsyncReplicaSessionLocals,
+    AsyncSessionLocal,
+    ReplicaSessionLocals,
+    SessionLocal,
+)
+from .auth import SESSION_USER_KEY, get_current_user, get_current_user_async
+from .auth_cache import UserContext
+
+
+class ReplicaRouter:
+    """
+    Picks the session factory for a read-only request.
+
+    Reads are spread round-robin over the replicas and fall back to the
+    primary when there are none. A user who committed a write within the last
+    ``sticky_seconds`` keeps reading from the primary, so replication lag never
+    hides their own changes from them. Recent writers are tracked per process:
+    a write handled by another worker is not seen here.
+    """
+
+    max_tracked_writers = 10000
+
+    def __init__(self, primary, replicas: list, sticky_seconds: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.sticky_seconds = sticky_seconds
+        self._next = itertools.count()
+        self._recent_writes: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.sticky_reads = 0
+
+    def mark_write(self, user_id: int) -> None:
+        """Route the user's reads to the primary for the next few seconds."""
+        if not self.replicas or self.sticky_seconds <= 0:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[user_id] = now + self.sticky_seconds
+            if len(self._recent_writes) > self.max_tracked_writers:
+                self._recent_writes = {
+                    writer: until
+                    for writer, until in self._recent_writes.items()
+                    if until > now
+                }
+
+    def session_factory(self, user_id: Optional[int] = None):
+        """
+        Return the session factory to read with on behalf of a user.
+
+        Args:
+            user_id: The ID of the user making the request, if any
+
+        Returns:
+            A replica's session factory, or the primary's
+        """
+        if not self.replicas:
+            self.primary_reads += 1
+            return self.primary
+
+        until = self._recent_writes.get(user_id)
+        if until is not None and until > time.monotonic():
+            self.sticky_reads += 1
+            return self.primary
+
+        self.replica_reads += 1
+        return self.replicas[next(self._next) % len(self.replicas)]
+
+    def stats(self) -> dict:
+        return {
+            "replicas": len(self.replicas),
+            "sticky_seconds": self.sticky_seconds,
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "recent_writers": len(self._recent_writes),
+        }
+
+
+replica_router = ReplicaRouter(
+    SessionLocal, ReplicaSessionLocals, READ_YOUR_WRITES_SECONDS
+)
+async_replica_router = ReplicaRouter(
+    AsyncSessionLocal, AsyncReplicaSessionLocals, READ_YOUR_WRITES_SECONDS
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_write(session: Session) -> None:
+    # Covers async sessions too, whose commits run on a sync Session
+    user_id = session.info.get(SESSION_USER_KEY)
+    if user_id is not None:
+        replica_router.mark_write(user_id)
+        async_replica_router.mark_write(user_id)
+
+
+# Dependency to get a DB session for read-only routes
+def get_read_db(current_user: UserContext = Depends(get_current_user)):
+    db = replica_router.session_factory(current_user.id)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Dependency to get an async DB session for read-only routes
+async def get_async_read_db(
+    current_user: UserContext = Depends(get_current_user_async),
+):
+    async with async_replica_router.session_factory(current_user.id)() as db:
+        yield db
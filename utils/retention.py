@@ -0,0 +1,163 @@
+import logging
+import re
+from datetime import date, datetime
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+
+from config import (
+    TOKEN_PARTITION_MONTHS_AHEAD,
+    TOKEN_PURGE_BATCH_SIZE,
+    TOKEN_REVOCATION_MODE,
+    engine,
+)
+from models.user import Token
+from .scheduler import advisory_lock
+
+logger = logging.getLogger(__name__)
+
+PARTITION_NAME = re.compile(r"^tokens_p(\d{4})_(\d{2})$")
+DEFAULT_PARTITION = "tokens_default"
+
+
+def purge_expired_tokens(batch_size: int = TOKEN_PURGE_BATCH_SIZE) -> dict:
+    """
+    Delete expired tokens in bounded batches.
+
+    On Postgres, where the tokens table is range-partitioned by month on
+    ``expires_at``, partitions that only hold expired tokens are dropped
+    outright and partitions for the coming months are created ahead of time.
+    Revoked tokens are also deleted in the database revocation mode; the
+    stateless mode needs them until they expire to rebuild its revocation
+    list.
+
+    Only one worker runs the purge at a time.
+
+    Args:
+        batch_size: Maximum number of rows deleted per transaction
+
+    Returns:
+        The number of deleted rows and the names of dropped partitions
+    """
+    result = {"deleted": 0, "dropped_partitions": [], "skipped": False}
+
+    with engine.connect() as connection:
+        with advisory_lock(connection, "purge_expired_tokens") as acquired:
+            if not acquired:
+                result["skipped"] = True
+                return result
+
+            now = datetime.utcnow()
+            if _is_partitioned(connection):
+                result["dropped_partitions"] = _drop_expired_partitions(connection, now)
+                _create_upcoming_partitions(connection, now)
+
+            result["deleted"] += _delete_in_batches(
+                connection, Token.expires_at < now, batch_size
+            )
+            if TOKEN_REVOCATION_MODE == "database":
+                result["deleted"] += _delete_in_batches(
+                    connection, Token.revoked == True, batch_size
+                )
+
+    return result
+
+
+def _delete_in_batches(connection: Connection, condition, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        batch = select(Token.id).where(condition).limit(batch_size)
+        rowcount = connection.execute(
+            delete(Token).where(condition, Token.id.in_(batch.scalar_subquery()))
+        ).rowcount
+        connection.commit()
+        deleted += rowcount
+        if rowcount < batch_size:
+            return deleted
+
+
+def _is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = 'tokens')"
+        )
+    ).scalar()
+
+
+def _partitions(connection: Connection) -> set[str]:
+    return set(
+        connection.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = 'tokens'"
+            )
+        ).scalars()
+    )
+
+
+def _drop_expired_partitions(connection: Connection, now: datetime) -> list[str]:
+    dropped = []
+    for name in _partitions(connection):
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        upper = _add_months(date(int(match[1]), int(match[2]), 1), 1)
+        if upper <= now.date():
+            connection.execute(text(f'DROP TABLE "{name}"'))
+            connection.commit()
+            dropped.append(name)
+    return sorted(dropped)
+
+
+def _create_upcoming_partitions(connection: Connection, now: datetime) -> None:
+    partitions = _partitions(connection)
+    month = date(now.year, now.month, 1)
+    for offset in range(TOKEN_PARTITION_MONTHS_AHEAD + 1):
+        lower = _add_months(month, offset)
+        name = f"tokens_p{lower:%Y_%m}"
+        if name in partitions:
+            continue
+        try:
+            _create_partition(
+                connection, name, lower, _add_months(lower, 1), partitions
+            )
+            connection.commit()
+        except SQLAlchemyError:
+            # Not fatal: tokens of the month stay in the default partition
+            # and expired ones are still deleted row by row
+            connection.rollback()
+            logger.warning("Could not create token partition %s", name, exc_info=True)
+
+
+def _create_partition(
+    connection: Connection, name: str, lower: date, upper: date, partitions: set[str]
+) -> None:
+    bounds = f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    if DEFAULT_PARTITION not in partitions:
+        connection.execute(text(f'CREATE TABLE "{name}" PARTITION OF tokens {bounds}'))
+        return
+
+    # Tokens of the month that went to the default partition, because it was
+    # not created in time, would make CREATE ... PARTITION OF fail; move them
+    # into the new table before attaching it instead
+    connection.execute(text(f'CREATE TABLE "{name}" (LIKE tokens INCLUDING DEFAULTS)'))
+    connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE expires_at >= :lower AND expires_at < :upper RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        {"lower": lower, "upper": upper},
+    )
+    connection.execute(text(f'ALTER TABLE tokens ATTACH PARTITION "{name}" {bounds}'))
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
@@ -0,0 +1,211 @@
+import logging
+import select
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, SessionTransaction
+
+from config import SessionLocal, engine
+from models.user import User, Token
+from .auth_cache import auth_cache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "token_revocations"
+# Revocations published through a session but not committed yet
+PENDING_KEY = "pending_revocations"
+
+
+class RevocationList:
+    """
+    In-memory view of token revocations used by the stateless auth mode.
+
+    Holds the revoked jtis that have not expired yet and the current token
+    epoch of every user that has logged out at least once. The list is rebuilt
+    from the database on startup and kept in sync across workers through
+    Postgres LISTEN/NOTIFY; on other databases it only covers this process.
+    """
+
+    def __init__(self):
+        self._revoked: dict[str, float] = {}
+        self._epochs: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._listener: threading.Thread | None = None
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def epoch(self, user_id: int) -> int:
+        return self._epochs.get(user_id, 0)
+
+    def load(self, db: Session) -> None:
+        """
+        Rebuild the list from the database.
+
+        Args:
+            db: Database session
+        """
+        now = datetime.utcnow()
+        revoked = {
+            jti: _timestamp(expires_at)
+            for jti, expires_at in db.query(Token.jti, Token.expires_at).filter(
+                Token.revoked == True,
+                Token.expires_at > now,
+            )
+        }
+        epochs = dict(
+            db.query(User.id, User.token_epoch).filter(User.token_epoch > 0).all()
+        )
+        with self._lock:
+            self._revoked = revoked
+            self._epochs = epochs
+
+    def revoke(self, db: Session, jti: str, expires_at: datetime) -> None:
+        """
+        Publish the revocation of a single token.
+
+        The notification is sent with the caller's transaction, so neither
+        this worker nor the others see it before ``db`` commits.
+
+        Args:
+            db: Database session
+            jti: The revoked token's unique identifier
+            expires_at: When the token expires anyway
+        """
+        self._publish(db, f"jti:{jti}:{_timestamp(expires_at)}")
+
+    def bump_epoch(self, db: Session, user_id: int, epoch: int) -> None:
+        """
+        Publish a user's new token epoch, once ``db`` commits.
+
+        Args:
+            db: Database session
+            user_id: The user's ID
+            epoch: The user's token epoch after the bump
+        """
+        self._publish(db, f"epoch:{user_id}:{epoch}")
+
+    def prune(self) -> None:
+        """Forget revoked tokens that have expired on their own."""
+        now = time.time()
+        with self._lock:
+            self._revoked = {
+                jti: expires_at
+                for jti, expires_at in self._revoked.items()
+                if expires_at > now
+            }
+
+    def start(self) -> None:
+        """
+        Load the list and, on Postgres, start listening for other workers.
+
+        The first load happens before this returns, so no request is
+        authenticated against an empty list; if it fails, startup fails.
+        """
+        self._reload()
+        if engine.dialect.name != "postgresql":
+            return
+
+        self._stop.clear()
+        self._listener = threading.Thread(
+            target=self._listen, name="token-revocations", daemon=True
+        )
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._revoked),
+            "epochs": len(self._epochs),
+            "listening": self._listener is not None and self._listener.is_alive(),
+        }
+
+    def _reload(self) -> None:
+        db = SessionLocal()
+        try:
+            self.load(db)
+        finally:
+            db.close()
+
+    def _publish(self, db: Session, message: str) -> None:
+        # Begins the transaction if needed, so that ending it always either
+        # applies or discards the message
+        connection = db.connection()
+        if connection.dialect.name == "postgresql":
+            db.execute(
+                text("SELECT pg_notify(:channel, :message)"),
+                {"channel": CHANNEL, "message": message},
+            )
+        db.info.setdefault(PENDING_KEY, []).append(message)
+
+    def _apply(self, message: str) -> None:
+        kind, key, value = message.split(":")
+        with self._lock:
+            if kind == "jti":
+                self._revoked[key] = float(value)
+            elif kind == "epoch":
+                user_id = int(key)
+                self._epochs[user_id] = max(int(value), self._epochs.get(user_id, 0))
+
+        if kind == "jti":
+            auth_cache.invalidate(key)
+        elif kind == "epoch":
+            auth_cache.invalidate_user(int(key))
+
+    def _listen(self) -> None:
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        backoff = 1
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = engine.dialect.loaded_dbapi.connect(*cargs, **cparams)
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {CHANNEL}")
+
+                # Anything published before LISTEN is picked up by the reload
+                self._reload()
+                backoff = 1
+
+                while not self._stop.is_set():
+                    if select.select([connection], [], [], 5) != ([], [], []):
+                        connection.poll()
+                        while connection.notifies:
+                            self._apply(connection.notifies.pop(0).payload)
+                    self.prune()
+            except Exception:
+                logger.exception("Token revocation listener failed, reconnecting")
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+
+def _timestamp(value: datetime) -> float:
+    # Token expiry is stored as naive UTC
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+revocation_list = RevocationList()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_published(session: Session) -> None:
+    # Covers async sessions too, whose commits run on a sync Session
+    for message in session.info.pop(PENDING_KEY, []):
+        revocation_list._apply(message)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_published(session: Session, transaction: SessionTransaction) -> None:
+    # Runs after after_commit, so only revocations rolled back are left
+    if transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,186 @@
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Mapping, Optional
+
+from sqlalchemy import Date, delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from config import SessionLocal
+from models.invoice import Invoice
+from models.report import RevenueRollup
+from .upsert import upsert
+
+# Invoice fields that determine its contribution to the rollups
+REVENUE_FIELDS = (
+    "organization_id",
+    "issue_date",
+    "client_id",
+    "status",
+    "subtotal",
+    "tax_amount",
+    "total",
+)
+AMOUNTS = ("invoice_count", "subtotal", "tax_amount", "total")
+
+
+def month_start(value: date) -> date:
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def revenue_values(invoice: Invoice) -> dict:
+    """The fields of an invoice that its rollup row depends on."""
+    return {field: getattr(invoice, field) for field in REVENUE_FIELDS}
+
+
+class RevenueDeltas:
+    """
+    Changes to the revenue rollups accumulated over one write.
+
+    Add the values of every invoice the write creates and subtract the
+    previous values of every invoice it changes or deletes, then ``apply`` the
+    deltas in the same transaction as the write.
+    """
+
+    def __init__(self):
+        self._deltas = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+
+    def add(self, values: Mapping, sign: int = 1) -> None:
+        """
+        Count an invoice in its rollup row.
+
+        Args:
+            values: The invoice's ``REVENUE_FIELDS``
+            sign: -1 to remove the invoice instead
+        """
+        if values["status"] is None:
+            return
+
+        key = (
+            values["organization_id"],
+            month_start(values["issue_date"]),
+            values["client_id"],
+            values["status"],
+        )
+        delta = self._deltas[key]
+        delta[0] += sign
+        delta[1] += sign * values["subtotal"]
+        delta[2] += sign * (values["tax_amount"] or 0)
+        delta[3] += sign * values["total"]
+
+    def subtract(self, values: Mapping) -> None:
+        self.add(values, sign=-1)
+
+    def apply(self, db: Session) -> None:
+        """
+        Upsert the accumulated deltas into the rollups.
+
+        Rows are written in key order, so concurrent writes touching the same
+        rollups lock them in the same order.
+
+        Args:
+            db: The session of the write the deltas belong to
+        """
+        rows = [
+            {
+                "organization_id": organization_id,
+                "month": month,
+                "client_id": client_id,
+                "status": status,
+                **dict(zip(AMOUNTS, delta)),
+            }
+            for (organization_id, month, client_id, status), delta in sorted(
+                self._deltas.items()
+            )
+            if any(delta)
+        ]
+        if not rows:
+            return
+
+        statement = upsert(db.get_bind().dialect.name, RevenueRollup)
+        statement = statement.on_conflict_do_update(
+            index_elements=["organization_id", "month", "client_id", "status"],
+            set_={
+                amount: getattr(RevenueRollup, amount)
+                + getattr(statement.excluded, amount)
+                for amount in AMOUNTS
+            },
+        )
+        db.execute(statement, rows)
+
+
+def record_revenue_change(
+    db: Session, before: Optional[Mapping] = None, after: Optional[Mapping] = None
+) -> None:
+    """
+    Update the rollups for a single invoice write.
+
+    Args:
+        db: The session of the write
+        before: The invoice's ``REVENUE_FIELDS`` before the write, if it existed
+        after: The invoice's ``REVENUE_FIELDS`` after the write, if it still exists
+    """
+    if before == after:
+        return
+
+    deltas = RevenueDeltas()
+    if before is not None:
+        deltas.subtract(before)
+    if after is not None:
+        deltas.add(after)
+    deltas.apply(db)
+
+
+def rebuild_revenue_rollups(organization_id: Optional[int] = None) -> int:
+    """
+    Recompute the rollups from the invoices table.
+
+    On Postgres the rollups are locked against concurrent invoice writes for
+    the duration, so writes committed during the rebuild are neither lost nor
+    counted twice.
+
+    Args:
+        organization_id: Only rebuild this organization's rollups
+
+    Returns:
+        The number of rollup rows written
+    """
+    db = SessionLocal()
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("LOCK TABLE revenue_rollups IN EXCLUSIVE MODE"))
+            month = func.date_trunc("month", Invoice.issue_date).cast(Date)
+        else:
+            month = func.date(Invoice.issue_date, "start of month")
+
+        totals = (
+            select(
+                Invoice.organization_id,
+                month,
+                Invoice.client_id,
+                Invoice.status,
+                func.count(),
+                func.sum(Invoice.subtotal),
+                func.sum(func.coalesce(Invoice.tax_amount, 0)),
+                func.sum(Invoice.total),
+            )
+            .where(Invoice.status.is_not(None))
+            .group_by(Invoice.organization_id, month, Invoice.client_id, Invoice.status)
+        )
+        clear = delete(RevenueRollup)
+        if organization_id is not None:
+            totals = totals.where(Invoice.organization_id == organization_id)
+            clear = clear.where(RevenueRollup.organization_id == organization_id)
+
+        db.execute(clear)
+        result = db.execute(
+            insert(RevenueRollup).from_select(
+                ["organization_id", "month", "client_id", "status", *AMOUNTS],
+                totals,
+            )
+        )
+        db.commit()
+        return result.rowcount
+    finally:
+        db.close()
@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Job:
+    name: str
+    interval_seconds: float
+    fn: Callable[[], object]
+    next_run: float = 0.0
+
+
+class Scheduler:
+    """
+    Runs registered jobs periodically on a background thread.
+
+    Every worker process runs its own scheduler; jobs that must only run once
+    across workers should guard themselves with ``advisory_lock``.
+    """
+
+    def __init__(self):
+        self._jobs: list[_Job] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add_job(
+        self, name: str, interval_seconds: float, fn: Callable[[], object]
+    ) -> None:
+        """
+        Register a job to run every ``interval_seconds``.
+
+        Args:
+            name: Name used in logs
+            interval_seconds: Delay between two runs
+            fn: The job to run
+        """
+        self._jobs.append(
+            _Job(name, interval_seconds, fn, time.monotonic() + interval_seconds)
+        )
+
+    def start(self) -> None:
+        if not self._jobs or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            for job in self._jobs:
+                if job.next_run > now:
+                    continue
+                try:
+                    job.fn()
+                except Exception:
+                    logger.exception("Scheduled job %s failed", job.name)
+                job.next_run = time.monotonic() + job.interval_seconds
+
+            next_run = min(job.next_run for job in self._jobs)
+            self._stop.wait(max(next_run - time.monotonic(), 0))
+
+
+@contextmanager
+def advisory_lock(connection: Connection, name: str):
+    """
+    Try to take a Postgres session-level advisory lock for ``name``.
+
+    Yields whether the lock was acquired. On other databases the lock is
+    always considered acquired.
+    """
+    if connection.dialect.name != "postgresql":
+        yield True
+        return
+
+    acquired = connection.execute(
+        text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": name}
+    ).scalar()
+    connection.commit()
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            connection.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": name}
+            )
+            connection.commit()
+
+
+scheduler = Scheduler()
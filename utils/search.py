@@ -0,0 +1,48 @@
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from models.product import PRODUCT_SEARCH_TEXT, Product
+
+
+def search_products(
+    db: Session, organization_id: int, q: str, limit: int
+) -> list[Product]:
+    """
+    Find an organization's products by name, SKU or description.
+
+    Exact and prefix SKU matches rank first, then name prefix matches, then
+    everything else. On Postgres the text also matches fuzzily (pg_trgm word
+    similarity, so typos still find the product) and those matches are ranked
+    by similarity; both the substring and the fuzzy match are answered by the
+    trigram index on ``PRODUCT_SEARCH_TEXT``. Other databases only match
+    substrings, with an unindexed ILIKE-style scan of the organization's
+    products.
+
+    Args:
+        db: Database session
+        organization_id: The organization's ID
+        q: The search text
+        limit: Maximum number of products returned
+
+    Returns:
+        The matching products, best match first
+    """
+    matches = PRODUCT_SEARCH_TEXT.icontains(q, autoescape=True)
+    rank = [
+        case(
+            (func.lower(Product.sku) == q.lower(), 0),
+            (Product.sku.istartswith(q, autoescape=True), 1),
+            (Product.name.istartswith(q, autoescape=True), 2),
+            else_=3,
+        )
+    ]
+    if db.get_bind().dialect.name == "postgresql":
+        matches = or_(matches, literal(q).op("<%")(PRODUCT_SEARCH_TEXT.self_group()))
+        rank.append(func.word_similarity(q, PRODUCT_SEARCH_TEXT).desc())
+
+    return db.scalars(
+        select(Product)
+        .where(Product.organization_id == organization_id, matches)
+        .order_by(*rank, Product.id)
+        .limit(limit)
+    ).all()
@@ -0,0 +1,100 @@
+from typing import Collection
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from models.enums import InvoiceStatus
+from models.invoice import InvoiceItem
+from models.product import Product
+
+# Invoices in these statuses hold their items' quantities out of stock
+STOCK_HOLDING_STATUSES = {InvoiceStatus.PENDING, InvoiceStatus.PAID}
+
+
+def holds_stock(status: InvoiceStatus | None) -> bool:
+    return status in STOCK_HOLDING_STATUSES
+
+
+def reserve_stock(
+    db: Session, organization_id: int, invoice_ids: Collection[int]
+) -> None:
+    """
+    Take the items of the given invoices out of stock.
+
+    All of the invoices' line items are applied at once, with one UPDATE of
+    the products they reference. The UPDATE decrements unconditionally and
+    returns the new quantities; if any of them went negative, the exception
+    raised leaves the caller's transaction uncommitted, so the check and the
+    write are atomic without reading the stock first.
+
+    Args:
+        db: The session of the invoice write
+        organization_id: The invoices' organization
+        invoice_ids: The invoices whose items are reserved
+
+    Raises:
+        HTTPException: 409 if a product has less stock than the invoices need
+    """
+    short = sorted(
+        product_id
+        for product_id, quantity in _adjust_stock(db, organization_id, invoice_ids, -1)
+        if quantity < 0
+    )
+    if short:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Insufficient stock for products: {', '.join(map(str, short))}",
+        )
+
+
+def release_stock(
+    db: Session, organization_id: int, invoice_ids: Collection[int]
+) -> None:
+    """Put the items of the given invoices back in stock."""
+    _adjust_stock(db, organization_id, invoice_ids, 1)
+
+
+def _adjust_stock(
+    db: Session, organization_id: int, invoice_ids: Collection[int], sign: int
+) -> list[tuple[int, int]]:
+    if not invoice_ids:
+        return []
+
+    demand = (
+        select(
+            InvoiceItem.product_id,
+            func.sum(InvoiceItem.quantity).label("quantity"),
+        )
+        .where(InvoiceItem.invoice_id.in_(invoice_ids))
+        .group_by(InvoiceItem.product_id)
+        .subquery()
+    )
+    # Lock the products in id order, so concurrent invoice writes sharing
+    # products queue up behind each other instead of deadlocking. NO KEY
+    # UPDATE, like the UPDATE itself, does not conflict with the key share
+    # locks that inserting the invoice items took on the products
+    locked = (
+        select(Product.id)
+        .where(
+            Product.organization_id == organization_id,
+            Product.id.in_(select(demand.c.product_id)),
+        )
+        .order_by(Product.id)
+        .with_for_update(key_share=True)
+        .subquery()
+    )
+    quantity = func.coalesce(Product.quantity_in_stock, 0) + sign * demand.c.quantity
+    return db.execute(
+        update(Product)
+        .where(Product.id == locked.c.id, Product.id == demand.c.product_id)
+        .values(
+            quantity_in_stock=quantity,
+            # Kept only while LOW_STOCK holds; a NULL reorder level is never low
+            low_stock_notified=Product.low_stock_notified
+            & Product.reorder_level.is_not(None)
+            & (quantity <= Product.reorder_level),
+        )
+        .returning(Product.id, Product.quantity_in_stock)
+        .execution_options(synchronize_session=False)
+    ).all()
@@ -0,0 +1,17 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def upsert(dialect_name: str, table):
+    """
+    Start an INSERT that supports ``on_conflict_do_update`` and
+    ``on_conflict_do_nothing`` on Postgres and SQLite alike.
+
+    Args:
+        dialect_name: Name of the dialect the statement runs on
+        table: Table or mapped class to insert into
+
+    Returns:
+        The dialect's INSERT construct
+    """
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    return dialect.insert(table)